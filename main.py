@@ -1,21 +1,49 @@
+import asyncio
+import inspect
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
 from core.focus import FocusManager
-from core.keyboard import KeyboardHandler
+from core.keyboard import ESC_TIMEOUT, KeyboardHandler
 from drawing.render import RenderContext
+from src.core.backend import CLEAR_SCREEN, TerminalBackend
 from src.core.color import ColorManager
+from src.core.encoder import FrameEncoder, FrameStats
+from src.core.frame_diff import FrontBuffer
+from src.core.metrics import FrameMetrics, RenderMetrics
+from src.core.scheduler import DEFAULT_FRAME_INTERVAL, FrameScheduler
 from src.core.screen_buffer import ScreenBuffer
 from src.core.term import TerminalController
+from src.drawing.compositor import Compositor
 from src.drawing.complex_shapes import ComplexShapes
 from src.drawing.drawing_interface import DrawingInterface
+from src.drawing.hud import PerformanceHud
 from src.drawing.primitives import DrawingPrimitives
 from src.ui.window import Window
 from ui.container import Container
 from ui.input import Input
+from ui.layout import distribute
 from ui.text import Text
 
 
+# Longest time the event loop waits for input while no frame is pending
+IDLE_TIMEOUT = 0.1
+# Longest wait while output the terminal did not take is pending
+DRAIN_TIMEOUT = 0.01
+
+
 class TerminalUI:
-    def __init__(self):
-        self.terminal: TerminalController = TerminalController()
+    def __init__(
+        self,
+        frame_interval: float = DEFAULT_FRAME_INTERVAL,
+        terminal: Optional[TerminalBackend] = None,
+    ):
+        # A MemoryTerminal runs the UI without taking over the real terminal
+        self.terminal: TerminalBackend = terminal or TerminalController()
+        self.terminal.enter()
         self.keyboard = KeyboardHandler()
         self.quit = False
 
@@ -31,12 +59,9 @@ class TerminalUI:
         self.screen_buffer: ScreenBuffer = resources.screen_buffer
         self.primitives: DrawingPrimitives = resources.primitives
         self.shapes: ComplexShapes = resources.shapes
+        # Counted with the other contexts in take_draw_calls()
         self.draw: DrawingInterface = resources.draw
 
-        self.draw: DrawingInterface = DrawingInterface(
-            self.screen_buffer, self.color_manager
-        )
-
         # Create root window
         self.root_window = Window(
             "root", 0, 0, self.screen_buffer.width, self.screen_buffer.height
@@ -47,13 +72,48 @@ class TerminalUI:
         self.root_window.primitives = self.primitives
         self.root_window.shapes = self.shapes
 
+        self.encoder = FrameEncoder(self.color_manager)
+        # What the terminal shows, diffed against the screen buffer each frame
+        self.front_buffer = FrontBuffer(
+            self.screen_buffer.width, self.screen_buffer.height
+        )
+
         self.windows: dict[str, Window] = {}
+        self.compositor = Compositor()
         self.first_render = True
 
+        # Splits are distributed again over the new width on resize
+        self._splits: list[tuple[list[Window], list[float]]] = []
+        # Called with the new (width, height) after the UI was resized
+        self.on_resize: Optional[Callable[[int, int], None]] = None
+        # Set by SIGWINCH, handled by the event loop outside the handler
+        self._resize_pending = False
+
+        # Phase timings and output counts of recent frames
+        self.metrics = RenderMetrics()
+        self.hud: Optional[PerformanceHud] = None
+
+        # Frames are produced by the scheduler, at most one per frame interval
+        self.scheduler = FrameScheduler(self._frame, frame_interval)
+        self.context.set_render_requester(self.request_render)
+        self._on_frame: Optional[Callable[[], None]] = None
+
+        # Set while run_async() drives the UI from an asyncio event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._frame_timer: Optional[asyncio.TimerHandle] = None
+        self._escape_timer: Optional[asyncio.TimerHandle] = None
+        # Descriptor watched for writability while output is pending
+        self._output_fd: Optional[int] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._tasks: set[asyncio.Task] = set()
+
         # Define which object handles which methods
         self._delegates = {
             "draw_at": self.primitives,
             "draw_string": self.primitives,
+            "blit": self.primitives,
+            "fill_row": self.primitives,
+            "fill_rect": self.primitives,
             "draw_rectangle": self.shapes,
             "draw_line": self.shapes,
         }
@@ -68,26 +128,252 @@ class TerminalUI:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> bool:
-        self.terminal._restore_cursor()
-        self.terminal._show_cursor()
-        self.terminal._use_main_screen()
+        self.keyboard.restore()
+        self.terminal.leave()
         if exc_type is KeyboardInterrupt:
             self.quit = True
             print("\nGoodbye!")
             return True  # Suppress the KeyboardInterrupt
 
-    def run(self):
-        """Main event loop"""
-        while not self.quit:
-            self.render()
+    def run(self, on_frame: Optional[Callable[[], None]] = None):
+        """
+        Main event loop.
+
+        Handles input and lets the scheduler produce frames when they were
+        requested. Key handlers may change anything, so every handled key
+        requests a frame.
+
+        Args:
+            on_frame: Called before every frame to update animated content.
+                While set, a new frame is requested after each one, so it
+                runs once per frame interval.
+        """
+        self._on_frame = on_frame
+        self.request_render()
+        # Leaving the loop, also on stop(), restores the terminal settings
+        with self.keyboard.raw_mode(), self._resize_signal():
+            while not self.quit:
+                timeout = self.scheduler.time_until_due()
+                if timeout is None:
+                    timeout = IDLE_TIMEOUT
+                if self.terminal.pending_fd() is not None:
+                    timeout = min(timeout, DRAIN_TIMEOUT)
+                key_event = self.keyboard.get_key(timeout)
+                if key_event:
+                    result = self._dispatch_key(key_event)
+                    if inspect.isawaitable(result):
+                        # Async handlers block the loop here, use run_async()
+                        asyncio.run(result)
+
+                self._handle_resize()
+                self.scheduler.tick()
+                # Send the rest of the last frame, even if no frame follows
+                self.terminal.ready()
+
+    async def run_async(self, on_frame: Optional[Callable[[], None]] = None):
+        """
+        Event loop mode for asyncio applications.
+
+        Stdin stays in raw mode and is registered with the running event loop,
+        so key events are dispatched as soon as they arrive and nothing polls.
+        Frames are scheduled as timers on the loop. Key handlers may be
+        coroutine functions, they run as tasks and request a frame when done.
+        Returns once stop() is called.
+
+        Args:
+            on_frame: Called before every frame, see run()
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._on_frame = on_frame
+        self._stopped = asyncio.Event()
+        if self.quit:
+            self._stopped.set()
+
+        with self.keyboard.raw_mode() as fd, self._resize_signal(loop):
+            loop.add_reader(fd, self._read_input, fd)
+            try:
+                self.request_render()
+                await self._stopped.wait()
+            finally:
+                loop.remove_reader(fd)
+                if self._output_fd is not None:
+                    loop.remove_writer(self._output_fd)
+                    self._output_fd = None
+                for timer in (self._frame_timer, self._escape_timer):
+                    if timer is not None:
+                        timer.cancel()
+                self._frame_timer = self._escape_timer = None
+                for task in list(self._tasks):
+                    task.cancel()
+                self._loop = None
+
+    def set_timer(
+        self, delay: float, callback: Callable, repeat: bool = False
+    ) -> asyncio.Task:
+        """
+        Call a function after a delay on the running event loop.
+
+        Args:
+            delay: Seconds to wait before (each) call
+            callback: Plain or coroutine function without arguments
+            repeat: Keep calling it every delay seconds
+
+        Returns:
+            The task running the timer; await it, or cancel it to stop it
+        """
+
+        async def timer():
+            while True:
+                await asyncio.sleep(delay)
+                result = callback()
+                if inspect.isawaitable(result):
+                    await result
+                self.request_render()
+                if not repeat:
+                    return
+
+        return self._spawn(timer())
+
+    def request_render(self):
+        """Schedule a frame; requests before it is rendered are merged"""
+        self.scheduler.request()
+        self._set_frame_timer()
+
+    def _set_frame_timer(self):
+        """Have the event loop render the pending frame when it is due"""
+        if (
+            self._loop is not None
+            and self._frame_timer is None
+            and self.scheduler.pending
+        ):
+            self._frame_timer = self._loop.call_later(
+                self.scheduler.time_until_due(), self._run_scheduled_frame
+            )
 
-            key_event = self.keyboard.get_key()
-            if key_event:
-                self.keyboard.handle_key(key_event)
+    def _run_scheduled_frame(self):
+        """Render the frame a loop timer was set for"""
+        # Resize first, its render request merges into this frame
+        self._handle_resize()
+        self._frame_timer = None
+        self.scheduler.tick()
+        # A dropped frame stays pending for the next slot
+        self._set_frame_timer()
+        self._watch_output()
+
+    def _watch_output(self):
+        """Have the event loop send pending output once the terminal takes it"""
+        if self._loop is None or self._output_fd is not None:
+            return
+        fd = self.terminal.pending_fd()
+        if fd is not None:
+            self._output_fd = fd
+            self._loop.add_writer(fd, self._flush_output)
+
+    def _flush_output(self):
+        """Send pending output, and stop watching once all of it went out"""
+        if self.terminal.ready():
+            self._loop.remove_writer(self._output_fd)
+            self._output_fd = None
+
+    @contextmanager
+    def _resize_signal(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Watch for terminal resizes (SIGWINCH) while an event loop runs.
+
+        The handler only flags the resize and requests a frame; the loop
+        resizes once before that frame, however many signals arrived.
+        Signals can only be handled in the main thread, and not at all on
+        platforms without SIGWINCH.
+        """
+        if (
+            not hasattr(signal, "SIGWINCH")
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            yield
+            return
+
+        if loop is not None:
+            loop.add_signal_handler(signal.SIGWINCH, self._on_resize_signal)
+        else:
+            previous = signal.signal(signal.SIGWINCH, self._on_resize_signal)
+        try:
+            yield
+        finally:
+            if loop is not None:
+                loop.remove_signal_handler(signal.SIGWINCH)
+            else:
+                signal.signal(signal.SIGWINCH, previous)
+
+    def _on_resize_signal(self, *_):
+        self._resize_pending = True
+        self.request_render()
+
+    def _handle_resize(self):
+        """Apply a resize reported by SIGWINCH"""
+        if self._resize_pending:
+            self._resize_pending = False
+            self.resize()
+
+    def _read_input(self, fd: int):
+        """Dispatch the key events that became readable on stdin"""
+        if self._escape_timer is not None:
+            self._escape_timer.cancel()
+            self._escape_timer = None
+
+        self._dispatch_keys(self.keyboard.read_keys(fd))
+
+        # A lone ESC is the Escape key unless more input follows shortly
+        if self.keyboard.decoder.pending:
+            self._escape_timer = self._loop.call_later(ESC_TIMEOUT, self._flush_input)
+
+    def _flush_input(self):
+        """Dispatch an escape sequence that was never completed"""
+        self._escape_timer = None
+        self._dispatch_keys(self.keyboard.decoder.flush())
+
+    def _dispatch_keys(self, key_events):
+        """Dispatch key events, running async handlers as tasks"""
+        for key_event in key_events:
+            result = self._dispatch_key(key_event)
+            if inspect.isawaitable(result):
+                task = self._spawn(result)
+                task.add_done_callback(lambda _: self.request_render())
+
+    def _dispatch_key(self, key_event):
+        """Pass a key event to its handler and schedule a frame"""
+        if key_event.ctrl and key_event.key == "C":
+            # Raw mode delivers Ctrl+C as a key instead of a signal
+            raise KeyboardInterrupt
+        result = self.keyboard.handle_key(key_event)
+        self.request_render()
+        return result
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        """Run a coroutine as a task on the running loop, keeping a reference"""
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _frame(self):
+        """Produce one scheduled frame, declining it while the output lags"""
+        if not self.terminal.ready():
+            # The terminal has not taken the last frame yet. Changes keep
+            # collecting in the component trees and buffers and go out
+            # together once it has; see scheduler.stats.dropped and merged.
+            return False
+        if self._on_frame:
+            self._on_frame()
+        self.render()
+        if self._on_frame:
+            self.request_render()
 
     def stop(self):
         """Stop the main loop"""
         self.quit = True
+        if self._stopped is not None:
+            self._stopped.set()
 
     def create_window(
         self, name: str, x: int, y: int, width: int, height: int, title: str = ""
@@ -95,8 +381,21 @@ class TerminalUI:
         """Create a new window with given dimensions"""
         window = Window(name, x, y, width, height, title)
         self.windows[name] = window
+        self.compositor.add(window)
         return window
 
+    def raise_window(self, name: str) -> None:
+        """Move a window one step up in the z-order"""
+        self.compositor.raise_window(self.windows[name])
+
+    def lower_window(self, name: str) -> None:
+        """Move a window one step down in the z-order"""
+        self.compositor.lower_window(self.windows[name])
+
+    def bring_to_front(self, name: str) -> None:
+        """Move a window above all others"""
+        self.compositor.bring_to_front(self.windows[name])
+
     def create_horizontal_split(
         self, names: list[str], ratios: list[float] = None
     ) -> list[Window]:
@@ -104,42 +403,124 @@ class TerminalUI:
         if ratios is None:
             ratios = [1 / len(names)] * len(names)
 
-        total_width = self.screen_buffer.width
+        # Widths add up to the screen width, whatever the rounding
+        widths = distribute(self.screen_buffer.width, ratios)
         current_x = 0
         windows = []
 
-        for name, ratio in zip(names, ratios, strict=True):
-            width = int(total_width * ratio)
+        for name, width in zip(names, widths, strict=True):
             window = self.create_window(
                 name, current_x, 0, width, self.screen_buffer.height
             )
             windows.append(window)
             current_x += width
 
+        self._splits.append((windows, ratios))
         return windows
 
+    def resize(self, width: Optional[int] = None, height: Optional[int] = None):
+        """
+        Adapt the UI to a new terminal size, by default the current one.
+
+        Buffers are resized in place and keep what they hold, and splits are
+        distributed over the new width. Windows that keep their size are not
+        drawn again, only composited where they became visible. Since the
+        terminal's content is unknown after a resize, the next frame clears
+        it and sends the whole screen.
+        """
+        if width is None or height is None:
+            width, height = self.terminal.get_size()
+        if (width, height) == (self.screen_buffer.width, self.screen_buffer.height):
+            return
+
+        self.screen_buffer.resize(width, height)
+        self.root_window._width, self.root_window._height = width, height
+        self.front_buffer.resize(width, height)
+        self.screen_buffer.mark_damaged(0, 0, width, height)
+        self.first_render = True
+
+        for windows, ratios in self._splits:
+            current_x = 0
+            for window, window_width in zip(
+                windows, distribute(width, ratios), strict=True
+            ):
+                window.x = current_x
+                window.resize(window_width, height)
+                current_x += window_width
+
+        if self.hud:
+            self.hud.resize(width, height)
+        if self.on_resize:
+            self.on_resize(width, height)
+        self.request_render()
+
     def render(self):
         """Render only the changed parts of the screen"""
-        if self.first_render:
-            self.terminal.clear_screen()
-            self.first_render = False
-
         # Clear main buffer
         # self.screen_buffer.clear()
 
-        # Render each window to main buffer:
-        for window in self.windows.values():
-            window.render_to(self.screen_buffer)
+        metrics = FrameMetrics()
+        start = time.perf_counter()
 
-        changes = self.screen_buffer.get_changes()
+        # Paint the component trees of the windows into their buffers
+        damage = self.compositor.paint(self.screen_buffer)
+        painted = time.perf_counter()
 
-        for (y, x), _ in changes.items():
-            # Move cursor to (x+1, y+1) since ANSI uses 1-based indexing
-            print(
-                f"\033[{y+1};{x+1}H{self.screen_buffer.get_char(x, y)}",
-                end="",
-                flush=True,
-            )
+        # Composite the windows into the main buffer in z-order
+        self.compositor.composite(self.screen_buffer, damage)
+        composited = time.perf_counter()
+
+        # Only cells that differ from what the terminal shows are sent
+        hud_rect = self.hud.rect if self.hud else None
+        spans = self.front_buffer.diff(self.screen_buffer, exclude=hud_rect)
+        diffed = time.perf_counter()
+
+        # Encode the whole frame and write it in one go
+        frame = self.encoder.encode(self.screen_buffer, spans)
+        if self.first_render:
+            # Cleared within the frame, so the blank screen never shows
+            frame = CLEAR_SCREEN + frame
+            self.first_render = False
+        encoded = time.perf_counter()
+        self.encoder.stats.writes = self.terminal.write_frame(frame)
+        written = time.perf_counter()
+
+        metrics.render = painted - start
+        metrics.composite = composited - painted
+        metrics.diff = diffed - composited
+        metrics.encode = encoded - diffed
+        metrics.write = written - encoded
+        metrics.cells = self.encoder.stats.cells
+        metrics.bytes_written = self.encoder.stats.bytes_written
+        metrics.draw_calls = self.context.take_draw_calls()
+        self.metrics.record(metrics)
+
+        # The HUD goes out after the measured frame, so it is not part of it
+        if self.hud:
+            self.terminal.write_frame(self.hud.frame(self.front_buffer, self.metrics))
+
+    def show_hud(self, x: Optional[int] = None, y: int = 0) -> None:
+        """Show the render metrics in an overlay, top right by default"""
+        self.hud = PerformanceHud(
+            self.color_manager,
+            self.screen_buffer.width,
+            self.screen_buffer.height,
+            x,
+            y,
+        )
+        self.request_render()
+
+    def hide_hud(self) -> None:
+        """Remove the metrics overlay and repaint what it covered"""
+        if self.hud:
+            self.screen_buffer.mark_damaged(*self.hud.rect)
+            self.hud = None
+            self.request_render()
+
+    @property
+    def frame_stats(self) -> FrameStats:
+        """Cell, byte and write counts of the last rendered frame"""
+        return self.encoder.stats
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+CLEAR_SCREEN = b"\033[2J\033[H"
+
+# DEC private mode 2026: the terminal holds back drawing until the end marker,
+# so a frame shows all at once. Terminals without it ignore both markers.
+BEGIN_SYNCHRONIZED_UPDATE = b"\033[?2026h"
+END_SYNCHRONIZED_UPDATE = b"\033[?2026l"
+
+
+class TerminalBackend(ABC):
+    """
+    Where a TerminalUI sends its output.
+
+    A backend reports the screen size, writes encoded frames and switches
+    the terminal modes the UI relies on (alternate screen, hidden cursor,
+    bracketed paste). Nothing is sent before enter(), so creating a backend
+    never takes over a terminal by itself.
+
+    Mode switches are plain escape sequences passed through write(); a
+    backend only has to implement get_size() and write().
+    """
+
+    def __init__(self, synchronized_output: bool = False) -> None:
+        self.entered = False
+        # Wrap frames in synchronized update markers
+        self.synchronized_output = synchronized_output
+
+    @abstractmethod
+    def get_size(self) -> tuple[int, int]:
+        """Get the terminal size (columns, rows)."""
+
+    @abstractmethod
+    def write(self, data: bytes) -> int:
+        """Write encoded output and return the number of writes it took."""
+
+    def ready(self) -> bool:
+        """
+        Whether the terminal has taken all earlier output.
+
+        Backends that write without blocking try to send what is still
+        pending first. While this is False the UI drops frames instead of
+        queueing them behind output the terminal has not read yet.
+        """
+        return True
+
+    def pending_fd(self) -> Optional[int]:
+        """
+        Descriptor to wait on while earlier output is still pending.
+
+        Event loops wait for it to become writable and call ready() to send
+        the rest, even when no frame follows. None when nothing is pending.
+        """
+        return None
+
+    def write_frame(self, data: bytes) -> int:
+        """
+        Write one complete frame, shown at once where the terminal can.
+
+        Returns:
+            The number of writes it took, 0 for an empty frame
+        """
+        if not data:
+            return 0
+        if self.synchronized_output:
+            data = BEGIN_SYNCHRONIZED_UPDATE + data + END_SYNCHRONIZED_UPDATE
+        return self.write(data)
+
+    def enter(self) -> None:
+        """Switch the terminal to the modes of a full screen UI."""
+        if self.entered:
+            return
+        self.entered = True
+        self._hide_cursor()
+        self._save_cursor()
+        self._use_alternate_screen()
+        self._enable_bracketed_paste()
+
+    def leave(self) -> None:
+        """Restore the modes changed by enter()."""
+        if not self.entered:
+            return
+        self.entered = False
+        self._disable_bracketed_paste()
+        self._restore_cursor()
+        self._show_cursor()
+        self._use_main_screen()
+
+    def clear_screen(self) -> None:
+        """Clear the terminal screen."""
+        self.write(CLEAR_SCREEN)
+
+    def _emit(self, sequence: str) -> None:
+        """Send a control sequence to the terminal right away."""
+        self.write(sequence.encode())
+
+    def _hide_cursor(self):
+        """Hide the terminal cursor."""
+        self._emit("\033[?25l")
+
+    def _show_cursor(self):
+        """Show the terminal cursor."""
+        self._emit("\033[?25h")
+
+    def _save_cursor(self):
+        """Save cursor position."""
+        self._emit("\033[s")
+
+    def _restore_cursor(self):
+        """Restore cursor position."""
+        self._emit("\033[u")
+
+    def _use_alternate_screen(self):
+        """Switch to alternate screen buffer."""
+        self._emit("\033[?1049h")
+
+    def _use_main_screen(self):
+        """Switch back to main screen buffer."""
+        self._emit("\033[?1049l")
+
+    def _enable_bracketed_paste(self):
+        """Have the terminal mark pasted text instead of typing it out."""
+        self._emit("\033[?2004h")
+
+    def _disable_bracketed_paste(self):
+        """Turn bracketed paste mode off again."""
+        self._emit("\033[?2004l")
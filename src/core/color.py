@@ -1,47 +1,37 @@
 import os
+from functools import lru_cache
+
+from core.palette import quantization_table
+from core.screen_buffer import DEFAULT_COLOR
+
+# Upper bound for each of the color caches. Animations that generate a new
+# color every frame evict the least recently used entries instead of growing.
+COLOR_CACHE_SIZE = 4096
 
 
 class ColorManager:
+    """
+    Converts colors to terminal escape codes for the detected color mode.
+
+    Colors are interned as color ids: the packed 0xRRGGBB value of the color.
+    The same color always yields the same id, an id never goes stale, and ids
+    can be passed to the drawing APIs and stored in a ScreenBuffer directly.
+    Parsing and escape generation are cached per id and color mode.
+    """
+
     def __init__(self):
         self.color_mode = self._detect_terminal_color_mode()
+        self._parse_hex = lru_cache(maxsize=COLOR_CACHE_SIZE)(self._parse_hex)
+        self._hsv_color = lru_cache(maxsize=COLOR_CACHE_SIZE)(self._hsv_color)
+        self._sgr_params = lru_cache(maxsize=COLOR_CACHE_SIZE)(self._sgr_params)
 
-    def coloured_square(self, hex_string: str) -> str:
+    def coloured_square(self, color) -> str:
         """Returns a coloured square that you can print to a terminal."""
-        hex_string = hex_string.strip("#")
-        assert len(hex_string) == 6
-        red = int(hex_string[:2], 16)
-        green = int(hex_string[2:4], 16)
-        blue = int(hex_string[4:6], 16)
-
-        if self.color_mode == "truecolor":
-            return f"\033[48:2::{red}:{green}:{blue}m \033[49m"
-        elif self.color_mode == "256":
-            closest_256 = self._rgb_to_256(red, green, blue)
-            return f"\033[48;5;{closest_256}m \033[49m"
-        else:
-            basic_colors = {
-                "00": 0,  # Black
-                "ff": 1,  # Red
-                "00ff00": 2,  # Green
-                "ffff00": 3,  # Yellow
-                "0000ff": 4,  # Blue
-                "ff00ff": 5,  # Magenta
-                "00ffff": 6,  # Cyan
-                "ffffff": 7,  # White
-            }
-            hex_value = f"{red:02x}{green:02x}{blue:02x}"
-            closest_basic = min(
-                basic_colors, key=lambda x: abs(int(hex_value, 16) - int(x, 16))
-            )
-            return f"\033[48;5;{basic_colors[closest_basic]}m \033[49m"
+        return f"{self.escape(self.color(color), background=True)} \033[49m"
 
     def _rgb_to_256(self, red, green, blue):
         """Map RGB to the 256-color palette."""
-        return (
-            int(round((red / 255) * 5)) * 36
-            + int(round((green / 255) * 5)) * 6
-            + int(round((blue / 255) * 5))
-        )
+        return quantization_table("256").lookup((red << 16) | (green << 8) | blue)
 
     def _detect_terminal_color_mode(self) -> str:
         """Detects the color mode of the terminal."""
@@ -54,30 +44,106 @@ class ColorManager:
         else:
             return "basic"
 
-    def format_color_codes(self, fg: str = None, bg: str = None) -> str:
-        """Create ANSI color codes for foreground and background colors."""
+    def color(self, spec) -> int:
+        """
+        Intern a color and return its color id.
+
+        Args:
+            spec: Hex string (e.g. "#FF0000"), (r, g, b) tuple, an existing
+                color id, or None for the terminal default
+
+        Returns:
+            Packed 0xRRGGBB color id, or DEFAULT_COLOR
+        """
+        if isinstance(spec, int):
+            return spec
+        if isinstance(spec, str):
+            return self._parse_hex(spec) if spec else DEFAULT_COLOR
+        if spec is None:
+            return DEFAULT_COLOR
+        r, g, b = spec
+        return (r << 16) | (g << 8) | b
+
+    def hsv_color(self, h: float, s: float, v: float) -> int:
+        """Intern an HSV color (components 0.0 to 1.0) and return its color id."""
+        return self._hsv_color(h, s, v)
+
+    def rgb(self, color: int) -> tuple[int, int, int]:
+        """Get the (r, g, b) components of a color id."""
+        return color >> 16, (color >> 8) & 0xFF, color & 0xFF
+
+    def color_params(self, color: int, background: bool = False) -> str:
+        """
+        Get the SGR parameters that select a color in the current color mode.
+
+        Args:
+            color: Color id or DEFAULT_COLOR
+            background: Whether to select the background instead of the foreground
+
+        Returns:
+            Parameter string without the CSI prefix (e.g. "38;2;255;0;0")
+        """
+        return self._sgr_params(self.color_mode, color, background)
+
+    def escape(self, color: int, background: bool = False) -> str:
+        """Get the full escape sequence that selects a color id."""
+        return f"\033[{self._sgr_params(self.color_mode, color, background)}m"
+
+    def format_color_codes(self, fg=None, bg=None) -> str:
+        """
+        Create ANSI color codes for foreground and background colors.
+
+        Colors may be anything color() accepts; None and DEFAULT_COLOR leave
+        the respective color untouched.
+        """
         codes = []
 
-        if fg:
-            fg = fg.strip("#")
-            r, g, b = int(fg[:2], 16), int(fg[2:4], 16), int(fg[4:], 16)
-            if self.color_mode == "truecolor":
-                codes.append(f"\033[38;2;{r};{g};{b}m")
-            elif self.color_mode == "256":
-                color_256 = self._rgb_to_256(r, g, b)
-                codes.append(f"\033[38;5;{color_256}m")
-
-        if bg:
-            bg = bg.strip("#")
-            r, g, b = int(bg[:2], 16), int(bg[2:4], 16), int(bg[4:], 16)
-            if self.color_mode == "truecolor":
-                codes.append(f"\033[48;2;{r};{g};{b}m")
-            elif self.color_mode == "256":
-                color_256 = self._rgb_to_256(r, g, b)
-                codes.append(f"\033[48;5;{color_256}m")
+        fg = self.color(fg)
+        if fg != DEFAULT_COLOR:
+            codes.append(self.escape(fg))
+
+        bg = self.color(bg)
+        if bg != DEFAULT_COLOR:
+            codes.append(self.escape(bg, background=True))
 
         return "".join(codes)
 
+    def cache_info(self) -> dict:
+        """Hit and miss statistics of the color caches."""
+        return {
+            "parse": self._parse_hex.cache_info(),
+            "hsv": self._hsv_color.cache_info(),
+            "escape": self._sgr_params.cache_info(),
+        }
+
+    def _parse_hex(self, hex_string: str) -> int:
+        """Parse a hex color string into a color id (cached per instance)."""
+        hex_string = hex_string.strip("#")
+        assert len(hex_string) == 6
+        return int(hex_string, 16)
+
+    def _hsv_color(self, h: float, s: float, v: float) -> int:
+        """Convert an HSV color into a color id (cached per instance)."""
+        return self.color(self.hsv_to_rgb(h, s, v))
+
+    def _sgr_params(self, mode: str, color: int, background: bool) -> str:
+        """Build the SGR parameters of a color id (cached per instance)."""
+        if color == DEFAULT_COLOR:
+            return "49" if background else "39"
+
+        if mode == "truecolor":
+            r, g, b = self.rgb(color)
+            return f"{48 if background else 38};2;{r};{g};{b}"
+
+        index = quantization_table(mode).lookup(color)
+        if mode == "256":
+            return f"{48 if background else 38};5;{index}"
+        elif index < 8:
+            return str((40 if background else 30) + index)
+        else:
+            # Bright variants of the ANSI colors
+            return str((100 if background else 90) + index - 8)
+
     def hsv_to_hex(self, h: float, s: float, v: float) -> str:
         """
         Convert HSV color values to hex string.
@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+
+from core.color import ColorManager
+from core.screen_buffer import (
+    ATTR_BOLD,
+    ATTR_DIM,
+    ATTR_SGR_CODES,
+    DEFAULT_COLOR,
+    ScreenBuffer,
+)
+
+
+@dataclass
+class FrameStats:
+    """Output statistics of the most recently emitted frame"""
+
+    cells: int = 0
+    runs: int = 0
+    cursor_moves: int = 0
+    bytes_written: int = 0
+    writes: int = 0
+
+
+class SgrState:
+    """
+    Tracks the graphic rendition the terminal currently has active.
+
+    transition() returns only the SGR parameters that differ between the
+    tracked state and the requested one, so runs of equally styled cells cost
+    no escape sequences at all.
+    """
+
+    def __init__(self, color_manager: ColorManager):
+        self.color_manager = color_manager
+        self.reset()
+
+    def reset(self) -> None:
+        """Assume the terminal is back at its default rendition."""
+        self.fg = DEFAULT_COLOR
+        self.bg = DEFAULT_COLOR
+        self.attrs = 0
+        self._fg_params = "39"
+        self._bg_params = "49"
+
+    @property
+    def is_default(self) -> bool:
+        return (
+            self.fg == DEFAULT_COLOR and self.bg == DEFAULT_COLOR and not self.attrs
+        )
+
+    def transition(self, fg: int, bg: int, attrs: int) -> str:
+        """Get the escape sequence that switches to the given rendition."""
+        if fg == self.fg and bg == self.bg and attrs == self.attrs:
+            return ""
+
+        if fg == DEFAULT_COLOR and bg == DEFAULT_COLOR and not attrs:
+            self.reset()
+            return "\033[0m"
+
+        params = []
+        if attrs != self.attrs:
+            params.extend(self._attr_params(self.attrs, attrs))
+            self.attrs = attrs
+
+        if fg != self.fg:
+            fg_params = self.color_manager.color_params(fg)
+            # Different colors may still quantize to the same palette entry
+            if fg_params != self._fg_params:
+                params.append(fg_params)
+                self._fg_params = fg_params
+            self.fg = fg
+
+        if bg != self.bg:
+            bg_params = self.color_manager.color_params(bg, background=True)
+            if bg_params != self._bg_params:
+                params.append(bg_params)
+                self._bg_params = bg_params
+            self.bg = bg
+
+        return f"\033[{';'.join(params)}m" if params else ""
+
+    @staticmethod
+    def _attr_params(old: int, new: int) -> list[str]:
+        """SGR parameters that turn the attributes in old into those in new."""
+        params = []
+        restore = 0
+        for flag, _, off in ATTR_SGR_CODES:
+            if old & flag and not new & flag and str(off) not in params:
+                params.append(str(off))
+                if off == 22:
+                    # 22 clears both bold and dim, re-enable the one we keep
+                    restore |= new & old & (ATTR_BOLD | ATTR_DIM)
+        for flag, on, _ in ATTR_SGR_CODES:
+            if (new & flag and not old & flag) or restore & flag:
+                params.append(str(on))
+        return params
+
+
+class FrameEncoder:
+    """Encodes the damaged cells of a screen buffer into one output frame."""
+
+    def __init__(self, color_manager: ColorManager):
+        self.color_manager = color_manager
+        self.sgr = SgrState(color_manager)
+        self.stats = FrameStats()
+
+    def encode(self, buffer: ScreenBuffer, spans) -> bytes:
+        """
+        Build the escape sequence stream that repaints the given cells.
+
+        A cursor move is only emitted when the next span does not start where
+        the previous one left the cursor, and SGR sequences are only emitted
+        where the rendition changes between consecutive cells. The frame ends
+        with the terminal back at its default rendition.
+
+        Args:
+            buffer: Screen buffer holding the current cell contents
+            spans: (y, x_start, x_end) spans of changed cells, sorted by row
+                and column, as returned by FrontBuffer.diff()
+
+        Returns:
+            The encoded frame, empty if nothing changed
+        """
+        stats = FrameStats()
+        parts = []
+        cursor = None
+        width = buffer.width
+        chars, fgs, bgs, attrs = buffer.chars, buffer.fg, buffer.bg, buffer.attrs
+        transition = self.sgr.transition
+
+        for y, x_start, x_end in spans:
+            if cursor != (y, x_start):
+                # ANSI uses 1-based indexing
+                parts.append(f"\033[{y + 1};{x_start + 1}H")
+                stats.cursor_moves += 1
+            row = y * width
+            for i in range(row + x_start, row + x_end):
+                parts.append(transition(fgs[i], bgs[i], attrs[i]))
+                parts.append(chr(chars[i]))
+            cursor = (y, x_end)
+            stats.cells += x_end - x_start
+            stats.runs += 1
+
+        if not self.sgr.is_default:
+            parts.append(self.sgr.transition(DEFAULT_COLOR, DEFAULT_COLOR, 0))
+
+        frame = "".join(parts).encode("utf-8")
+        stats.bytes_written = len(frame)
+        self.stats = stats
+        return frame
@@ -0,0 +1,161 @@
+from array import array
+from typing import Optional
+
+from core.screen_buffer import ScreenBuffer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, comparisons fall back to array
+    np = None
+
+# Unchanged cells bridged between two changed runs of a row. Resending a few
+# cells is cheaper than the cursor move needed to skip over them.
+MERGE_GAP = 4
+
+# Code point no character has, used to force cells to differ
+INVALID_CHAR = 0xFFFFFFFF
+
+
+class FrontBuffer:
+    """
+    Mirror of what the terminal currently shows.
+
+    Drawing goes into a back ScreenBuffer, which only records the damaged
+    span of each row. At frame time diff() compares those spans against this
+    mirror: rows whose damaged span still holds identical cells are skipped
+    with a single slice comparison per field, and the remaining rows are
+    compared cell by cell (vectorized through NumPy when available). The
+    mirror is then brought up to date in place, span by span, so the two
+    buffers never need to be reallocated or copied in full.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.buffer = ScreenBuffer(width, height)
+        self.buffer.take_damage()
+
+    def invalidate(self) -> None:
+        """
+        Forget what the terminal shows, e.g. after it was cleared externally.
+
+        Every damaged cell of the back buffer counts as changed on the next
+        diff; mark the whole back buffer damaged to repaint the full screen.
+        """
+        size = self.buffer.width * self.buffer.height
+        self.buffer.chars[:] = array("I", [INVALID_CHAR]) * size
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Match a new screen size and forget what the terminal shows.
+
+        Terminals clip, reflow or clear their content when resized, so the
+        next diff has to send every damaged cell.
+        """
+        self.buffer.resize(width, height)
+        self.buffer.take_damage()
+        self.invalidate()
+
+    def diff(
+        self, back: ScreenBuffer, exclude: Optional[tuple[int, int, int, int]] = None
+    ) -> list[tuple[int, int, int]]:
+        """
+        Find the cells where the back buffer differs from the terminal.
+
+        Consumes the damage of the back buffer and updates the mirror to match
+        it.
+
+        Args:
+            back: Buffer holding the frame to show
+            exclude: (x, y, width, height) area owned by something else, e.g.
+                an overlay; its damage is dropped and its cells left alone
+
+        Returns:
+            (y, x_start, x_end) spans of changed cells, sorted by row and column
+        """
+        front = self.buffer
+        width = back.width
+        fields = (
+            (back.chars, front.chars),
+            (back.fg, front.fg),
+            (back.bg, front.bg),
+            (back.attrs, front.attrs),
+        )
+        views = None
+        if np is not None:
+            views = [
+                (
+                    np.frombuffer(new, dtype=new.typecode),
+                    np.frombuffer(old, dtype=old.typecode),
+                )
+                for new, old in fields
+            ]
+
+        spans = []
+        for damage_x, y, damage_w, h in back.take_damage():
+            for row in range(y, y + h):
+                for x, w in _outside(row, damage_x, damage_w, exclude):
+                    start = row * width + x
+                    end = start + w
+                    if all(new[start:end] == old[start:end] for new, old in fields):
+                        continue
+
+                    if views is not None:
+                        runs = self._changed_runs_numpy(views, start, end)
+                    else:
+                        runs = self._changed_runs(fields, start, end)
+
+                    for run_start, run_end in runs:
+                        for new, old in fields:
+                            old[start + run_start : start + run_end] = new[
+                                start + run_start : start + run_end
+                            ]
+                        spans.append((row, x + run_start, x + run_end))
+
+        return spans
+
+    @staticmethod
+    def _changed_runs(fields, start: int, end: int) -> list[tuple[int, int]]:
+        """Runs of changed offsets within [start, end), compared per cell."""
+        changed = set()
+        for new, old in fields:
+            new_cells, old_cells = new[start:end], old[start:end]
+            if new_cells != old_cells:
+                changed.update(
+                    i
+                    for i, (a, b) in enumerate(zip(new_cells, old_cells, strict=True))
+                    if a != b
+                )
+        return _merge_runs(sorted(changed))
+
+    @staticmethod
+    def _changed_runs_numpy(views, start: int, end: int) -> list[tuple[int, int]]:
+        """Runs of changed offsets within [start, end), compared vectorized."""
+        mask = np.zeros(end - start, dtype=bool)
+        for new, old in views:
+            mask |= new[start:end] != old[start:end]
+        return _merge_runs(np.flatnonzero(mask).tolist())
+
+
+def _outside(row: int, x: int, width: int, exclude) -> list[tuple[int, int]]:
+    """(x, width) parts of a row span that are not in the excluded area."""
+    if exclude is None:
+        return [(x, width)]
+    ex, ey, ew, eh = exclude
+    if not ey <= row < ey + eh or ex >= x + width or ex + ew <= x:
+        return [(x, width)]
+    parts = []
+    if ex > x:
+        parts.append((x, ex - x))
+    if ex + ew < x + width:
+        parts.append((ex + ew, x + width - ex - ew))
+    return parts
+
+
+def _merge_runs(offsets: list[int]) -> list[tuple[int, int]]:
+    """Merge sorted offsets into [start, end) runs, bridging gaps of MERGE_GAP."""
+    runs = []
+    for offset in offsets:
+        if runs and offset - runs[-1][1] <= MERGE_GAP:
+            runs[-1][1] = offset + 1
+        else:
+            runs.append([offset, offset + 1])
+    return [(run_start, run_end) for run_start, run_end in runs]
@@ -0,0 +1,231 @@
+import codecs
+from dataclasses import dataclass
+
+
+@dataclass
+class KeyEvent:
+    key: str
+    ctrl: bool = False
+    alt: bool = False
+    char: str = ""
+    shift: bool = False
+    # Pasted text of a "paste" event
+    text: str = ""
+
+
+# Final characters of CSI/SS3 sequences that name a key directly
+LETTER_KEYS = {
+    "A": "up",
+    "B": "down",
+    "C": "right",
+    "D": "left",
+    "H": "home",
+    "F": "end",
+    "P": "f1",
+    "Q": "f2",
+    "R": "f3",
+    "S": "f4",
+}
+
+# Numbers of "CSI number ~" sequences
+TILDE_KEYS = {
+    1: "home",
+    2: "insert",
+    3: "delete",
+    4: "end",
+    5: "pageup",
+    6: "pagedown",
+    7: "home",
+    8: "end",
+    11: "f1",
+    12: "f2",
+    13: "f3",
+    14: "f4",
+    15: "f5",
+    17: "f6",
+    18: "f7",
+    19: "f8",
+    20: "f9",
+    21: "f10",
+    23: "f11",
+    24: "f12",
+}
+
+# Control characters with a key of their own rather than Ctrl+letter
+CONTROL_KEYS = {
+    "\r": "enter",
+    "\n": "enter",
+    "\t": "tab",
+    "\x7f": "backspace",
+    "\x08": "backspace",
+}
+
+# End of a bracketed paste, which starts with "CSI 200 ~"
+PASTE_END = "\x1b[201~"
+
+# Parser states
+GROUND, ESCAPE, CSI, SS3, PASTE = range(5)
+
+
+class InputDecoder:
+    """
+    Incremental decoder from raw terminal input to key events.
+
+    Input may be fed in chunks of any size: UTF-8 characters and escape
+    sequences split across reads are completed by the next feed(). The
+    decoder is a small state machine over characters (ground, ESC, CSI and
+    SS3) and understands xterm style modifier parameters, so its cost is
+    linear in the input no matter how it is chunked.
+
+    A lone ESC cannot be told apart from the start of a sequence until more
+    input arrives; it stays pending until then or until flush() is called
+    after a short quiet period.
+
+    Bracketed pastes are collected in bulk, by searching each chunk for the
+    end marker rather than stepping through it, and delivered as a single
+    "paste" event holding the whole text.
+    """
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._state = GROUND
+        self._params = ""
+        # Pasted text so far, and a tail that may be the start of PASTE_END
+        self._paste: list[str] = []
+        self._paste_tail = ""
+
+    @property
+    def pending(self) -> bool:
+        """Whether an unfinished escape sequence is waiting for more input"""
+        return self._state not in (GROUND, PASTE)
+
+    def feed(self, data: bytes) -> list[KeyEvent]:
+        """Decode a chunk of input into the key events it completes"""
+        events = []
+        text = self._utf8.decode(data)
+        i = 0
+        while i < len(text):
+            if self._state == PASTE:
+                i = self._paste_step(text, i, events)
+            else:
+                self._step(text[i], events)
+                i += 1
+        return events
+
+    def flush(self) -> list[KeyEvent]:
+        """Give up waiting for the rest of a sequence and emit what was read"""
+        events = []
+        if self._state == PASTE:
+            # Input ended inside a paste, deliver what arrived
+            self._paste.append(self._paste_tail)
+            events.append(self._paste_event())
+        elif self._state == ESCAPE:
+            events.append(KeyEvent(key="esc"))
+        elif self._state == SS3:
+            events.append(KeyEvent(key="text", char="O", alt=True))
+        elif self._state == CSI:
+            events.append(KeyEvent(key="text", char="[", alt=True))
+        self._state = GROUND
+        self._params = ""
+        return events
+
+    def _step(self, char: str, events: list[KeyEvent]) -> None:
+        """Advance the state machine by one character"""
+        state = self._state
+        if state == GROUND:
+            if char == "\x1b":
+                self._state = ESCAPE
+            else:
+                events.append(self._plain_key(char))
+
+        elif state == ESCAPE:
+            if char == "[":
+                self._state = CSI
+                self._params = ""
+            elif char == "O":
+                self._state = SS3
+            elif char == "\x1b":
+                # ESC ESC: the first one was the key, the second may start more
+                events.append(KeyEvent(key="esc"))
+            else:
+                # ESC prefix is how terminals send Alt+key
+                event = self._plain_key(char)
+                event.alt = True
+                events.append(event)
+                self._state = GROUND
+
+        elif state == CSI:
+            if "\x40" <= char <= "\x7e":  # Final character
+                self._state = GROUND
+                if char == "~" and self._params == "200":
+                    self._state = PASTE
+                    return
+                event = self._csi_key(self._params, char)
+                if event:
+                    events.append(event)
+            else:
+                self._params += char
+
+        elif state == SS3:
+            self._state = GROUND
+            key = LETTER_KEYS.get(char)
+            if key:
+                events.append(KeyEvent(key=key))
+
+    def _paste_step(self, text: str, i: int, events: list[KeyEvent]) -> int:
+        """Consume pasted text from text[i:], returning where decoding resumes"""
+        tail_length = len(self._paste_tail)
+        pasted = self._paste_tail + text[i:]
+        end = pasted.find(PASTE_END)
+        if end < 0:
+            # Hold back what could be the start of an end marker split by reads
+            keep = len(PASTE_END) - 1
+            self._paste.append(pasted[:-keep])
+            self._paste_tail = pasted[-keep:]
+            return len(text)
+
+        self._paste.append(pasted[:end])
+        events.append(self._paste_event())
+        self._state = GROUND
+        return i + end + len(PASTE_END) - tail_length
+
+    def _paste_event(self) -> KeyEvent:
+        """Event of the collected paste, with line breaks normalized to \\n"""
+        text = "".join(self._paste).replace("\r\n", "\n").replace("\r", "\n")
+        self._paste, self._paste_tail = [], ""
+        return KeyEvent(key="paste", text=text)
+
+    @staticmethod
+    def _plain_key(char: str) -> KeyEvent:
+        """Key event of a character outside of escape sequences"""
+        if char in CONTROL_KEYS:
+            return KeyEvent(key=CONTROL_KEYS[char])
+        if ord(char) < 32:  # Control characters
+            return KeyEvent(key=chr(ord(char) + 64), ctrl=True)
+        return KeyEvent(key="text", char=char)
+
+    @staticmethod
+    def _csi_key(params: str, final: str):
+        """Key event of a complete CSI sequence, None if it is not a key"""
+        try:
+            numbers = [int(param) if param else 1 for param in params.split(";")]
+        except ValueError:  # Private or intermediate characters
+            return None
+
+        if final == "~":
+            key = TILDE_KEYS.get(numbers[0])
+        elif final == "Z":
+            return KeyEvent(key="tab", shift=True)
+        else:
+            key = LETTER_KEYS.get(final)
+        if key is None:
+            return None
+
+        # xterm encodes modifiers as 1 + (shift | alt << 1 | ctrl << 2)
+        modifiers = numbers[1] - 1 if len(numbers) > 1 else 0
+        return KeyEvent(
+            key=key,
+            shift=bool(modifiers & 1),
+            alt=bool(modifiers & 2),
+            ctrl=bool(modifiers & 4),
+        )
@@ -1,23 +1,31 @@
-import sys
+import os
 import select
-import tty
+import sys
 import termios
-from dataclasses import dataclass
-from typing import Optional, Callable
+import tty
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Optional, Callable
+
+from core.input_decoder import InputDecoder, KeyEvent
 
+# Bytes taken from stdin per read, enough for a burst of key repeats or a paste
+READ_SIZE = 4096
 
-@dataclass
-class KeyEvent:
-    key: str
-    ctrl: bool = False
-    alt: bool = False
-    char: str = ""
+# Quiet time after which a lone ESC is taken as the Escape key, in seconds
+ESC_TIMEOUT = 0.05
 
 
 class KeyboardHandler:
     def __init__(self) -> None:
         self.handlers: dict[str, Callable[[KeyEvent], None]] = {}
         self.text_handler: Optional[Callable[[KeyEvent], None]] = None
+        self.paste_handler: Optional[Callable[[KeyEvent], None]] = None
+        self.decoder = InputDecoder()
+        # Decoded events not handed out yet, a single read can hold many
+        self._events: deque[KeyEvent] = deque()
+        self._fd: Optional[int] = None
+        self._saved_settings = None
 
     def on_key(self, key: str) -> Callable:
         """Decorator to register a key handler"""
@@ -33,44 +41,94 @@ class KeyboardHandler:
         self.text_handler = func
         return func
 
-    def handle_key(self, event: KeyEvent) -> None:
-        """Handle a key event if a handler exists"""
+    def on_paste(self, func: Callable[[KeyEvent], None]) -> Callable:
+        """Decorator to register a handler receiving pasted text in one piece"""
+        self.paste_handler = func
+        return func
+
+    def handle_key(self, event: KeyEvent) -> Any:
+        """
+        Handle a key event if a handler exists.
+
+        Returns:
+            Whatever the handler returned, e.g. a coroutine of an async
+            handler for the event loop to run
+        """
         # First check if it's a single character that has a specific handler
         if event.key == "text" and event.char in self.handlers:
-            self.handlers[event.char](KeyEvent(key=event.char))
+            return self.handlers[event.char](KeyEvent(key=event.char))
         # Then check other key handlers
         elif event.key in self.handlers:
-            self.handlers[event.key](event)
+            return self.handlers[event.key](event)
         # Finally, treat it as text input
         elif event.key == "text" and self.text_handler:
-            self.text_handler(event)
+            return self.text_handler(event)
+        elif event.key == "paste":
+            if self.paste_handler:
+                return self.paste_handler(event)
+            # Without a bulk handler, type the paste out character by character
+            if self.text_handler:
+                for char in event.text:
+                    self.text_handler(KeyEvent(key="text", char=char))
+        return None
 
-    def _handle_special_key(self, key: str) -> KeyEvent:
-        """Handle special keys like arrows"""
-        key_mapping = {"A": "up", "B": "down", "C": "right", "D": "left"}
-        return KeyEvent(key=key_mapping.get(key, key))
+    def enter_raw_mode(self) -> int:
+        """
+        Switch stdin to raw mode for the rest of the session.
+
+        The terminal settings are saved once and only restored by restore(),
+        so reading keys costs no termios calls. Returns the stdin descriptor.
+        """
+        if self._fd is None:
+            fd = sys.stdin.fileno()
+            self._saved_settings = termios.tcgetattr(fd)
+            tty.setraw(fd)
+            self._fd = fd
+        return self._fd
+
+    def restore(self) -> None:
+        """Leave raw mode, restoring the terminal settings saved on entry"""
+        if self._fd is not None:
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved_settings)
+            self._fd = None
+
+    @contextmanager
+    def raw_mode(self):
+        """Keep stdin in raw mode for the duration of the block"""
+        entered = self._fd is None
+        fd = self.enter_raw_mode()
+        try:
+            yield fd
+        finally:
+            if entered:
+                self.restore()
 
     def get_key(self, timeout=0.1) -> Optional[KeyEvent]:
         """Get a single keypress with timeout"""
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(fd)
-            ready, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not self._events:
+            fd = self.enter_raw_mode()
+            ready, _, _ = select.select([fd], [], [], timeout)
             if ready:
-                char = sys.stdin.read(1)
-                if char == "\x1b":  # ESC sequence
-                    char = sys.stdin.read(1)
-                    if char == "[":
-                        key = sys.stdin.read(1)
-                        return self._handle_special_key(key)
-                    return KeyEvent(key="esc")
-                elif char == "\x7f":  # Backspace
-                    return KeyEvent(key="backspace")
-                elif ord(char) < 32:  # Control characters
-                    return KeyEvent(key=chr(ord(char) + 64), ctrl=True)
-                else:  # Regular text input
-                    return KeyEvent(key="text", char=char)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return None
+                self._events.extend(self.read_keys(fd))
+            # Wait briefly for the rest of a sequence before taking it as typed
+            while self.decoder.pending:
+                ready, _, _ = select.select([fd], [], [], ESC_TIMEOUT)
+                if not ready:
+                    self._events.extend(self.decoder.flush())
+                    break
+                self._events.extend(self.read_keys(fd))
+        return self._events.popleft() if self._events else None
+
+    def read_keys(self, fd: int) -> list[KeyEvent]:
+        """
+        Read whatever input is available on a ready descriptor as key events.
+
+        One read takes everything the terminal has buffered, up to READ_SIZE
+        bytes, and does not block because the descriptor is readable.
+        Sequences cut off at the end of the read are completed by the next.
+        """
+        data = os.read(fd, READ_SIZE)
+        if not data:
+            # End of input, nothing more can complete a pending sequence
+            return self.decoder.flush()
+        return self.decoder.feed(data)
@@ -0,0 +1,103 @@
+import math
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Optional
+
+# Frames the rolling statistics are computed over
+DEFAULT_WINDOW = 300
+
+# Timed phases of a frame, in the order they run
+PHASES = ("render", "composite", "diff", "encode", "write")
+
+
+@dataclass
+class FrameMetrics:
+    """Where the time of one frame went, and how much it produced"""
+
+    # Seconds spent painting the component trees of the windows
+    render: float = 0.0
+    # Seconds spent copying window buffers into the screen buffer
+    composite: float = 0.0
+    # Seconds spent finding the cells the terminal has to be sent
+    diff: float = 0.0
+    # Seconds spent building the escape sequence stream
+    encode: float = 0.0
+    # Seconds spent writing the frame to the terminal
+    write: float = 0.0
+    cells: int = 0
+    bytes_written: int = 0
+    draw_calls: int = 0
+
+    @property
+    def total(self) -> float:
+        return self.render + self.composite + self.diff + self.encode + self.write
+
+
+class RenderMetrics:
+    """
+    Rolling statistics over the most recent frames.
+
+    TerminalUI records one FrameMetrics per rendered frame. Percentiles are
+    computed on demand over the last `window` frames, so recording costs an
+    append and memory stays bounded however long the UI runs.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.frames: deque[FrameMetrics] = deque(maxlen=window)
+        # Frames recorded since creation or the last reset()
+        self.count = 0
+
+    def record(self, frame: FrameMetrics) -> None:
+        self.frames.append(frame)
+        self.count += 1
+
+    def reset(self) -> None:
+        self.frames.clear()
+        self.count = 0
+
+    @property
+    def last(self) -> Optional[FrameMetrics]:
+        """Metrics of the most recent frame, None before the first"""
+        return self.frames[-1] if self.frames else None
+
+    def values(self, field: str) -> list[float]:
+        """A field, or "total", over the frames in the window, oldest first"""
+        return [getattr(frame, field) for frame in self.frames]
+
+    def percentile(self, field: str, percent: float) -> float:
+        """
+        Nearest-rank percentile of a field over the window.
+
+        Args:
+            field: Name of a FrameMetrics field or "total"
+            percent: 0 to 100, e.g. 95 for the 95th percentile
+        """
+        return _nearest_rank(sorted(self.values(field)), percent)
+
+    def summary(
+        self, percents: tuple[float, ...] = (50, 95, 99)
+    ) -> dict[str, dict[str, float]]:
+        """
+        Percentiles and maximum of every field over the window.
+
+        Returns:
+            {field: {"p50": ..., "p95": ..., "p99": ..., "max": ...}}
+        """
+        names = [field.name for field in fields(FrameMetrics)] + ["total"]
+        summary = {}
+        for name in names:
+            values = sorted(self.values(name))
+            stats = {
+                f"p{percent:g}": _nearest_rank(values, percent) for percent in percents
+            }
+            stats["max"] = values[-1] if values else 0.0
+            summary[name] = stats
+        return summary
+
+
+def _nearest_rank(values: list[float], percent: float) -> float:
+    """Percentile of sorted values, the smallest covering percent of them"""
+    if not values:
+        return 0.0
+    rank = math.ceil(percent * len(values) / 100)
+    return values[min(max(rank, 1), len(values)) - 1]
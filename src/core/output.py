@@ -0,0 +1,113 @@
+import os
+import select
+
+
+class OutputWriter:
+    """
+    Writes bytes straight to a file descriptor.
+
+    Frames arrive fully encoded, so the text layer of sys.stdout and its
+    buffering only add copies and flushes. Each write() hands the whole
+    chunk to a single os.write() and loops only for what the kernel did not
+    take, e.g. when a pty buffer fills up.
+
+    On a non-blocking descriptor nothing waits: what the kernel did not take
+    stays pending and goes out first on the next write() or flush(). Callers
+    check `pending` to hold back new output while the terminal lags behind.
+    """
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.blocking = os.get_blocking(fd)
+        # Bytes accepted but not written yet, from offset on
+        self._pending = b""
+        self._offset = 0
+        # Totals since creation
+        self.writes = 0
+        self.bytes_written = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of bytes still waiting for the descriptor"""
+        return len(self._pending) - self._offset
+
+    def write(self, data: bytes) -> int:
+        """
+        Write data after anything still pending.
+
+        Returns:
+            The number of os.write() calls made
+        """
+        if self.pending:
+            self._pending = self._pending[self._offset :] + data
+        else:
+            self._pending = data
+        self._offset = 0
+        return self.flush()
+
+    def flush(self) -> int:
+        """Write pending bytes, waiting for room only on a blocking descriptor."""
+        calls = 0
+        view = memoryview(self._pending)
+        while self._offset < len(view):
+            try:
+                written = os.write(self.fd, view[self._offset :])
+            except BlockingIOError:
+                if not self.blocking:
+                    break
+                select.select([], [self.fd], [])
+                continue
+            calls += 1
+            self._offset += written
+            self.bytes_written += written
+        self.writes += calls
+        if not self.pending:
+            self._pending = b""
+            self._offset = 0
+        return calls
+
+    def drain(self) -> None:
+        """Wait until everything pending is written, e.g. before exiting."""
+        while self.pending:
+            select.select([], [self.fd], [])
+            self.flush()
+
+
+class StreamWriter:
+    """
+    Writes bytes through a file object that has no file descriptor.
+
+    Used when sys.stdout was replaced, e.g. by io.StringIO or an IDE
+    console. Output is decoded and handed to the stream's write() and
+    flush(), which block until the stream took it, so nothing is ever
+    pending.
+    """
+
+    blocking = True
+    pending = 0
+
+    def __init__(self, stream):
+        self.stream = stream
+        # Totals since creation
+        self.writes = 0
+        self.bytes_written = 0
+
+    def write(self, data: bytes) -> int:
+        """
+        Write data to the stream and flush it.
+
+        Returns:
+            The number of write() calls made
+        """
+        self.stream.write(data.decode("utf-8", "replace"))
+        self.stream.flush()
+        self.writes += 1
+        self.bytes_written += len(data)
+        return 1
+
+    def flush(self) -> int:
+        """Nothing is ever pending, see write()."""
+        return 0
+
+    def drain(self) -> None:
+        """Nothing is ever pending, see write()."""
@@ -0,0 +1,155 @@
+from array import array
+from functools import lru_cache
+from typing import Callable
+
+# Channel levels of the 6x6x6 color cube (indices 16-231) of the 256 palette
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Levels of the 24-step grayscale ramp (indices 232-255) of the 256 palette
+GRAY_LEVELS = tuple(8 + 10 * i for i in range(24))
+
+# xterm defaults for the 16 ANSI colors, normal then bright
+ANSI_COLORS = (
+    (0, 0, 0),
+    (205, 0, 0),
+    (0, 205, 0),
+    (205, 205, 0),
+    (0, 0, 238),
+    (205, 0, 205),
+    (0, 205, 205),
+    (229, 229, 229),
+    (127, 127, 127),
+    (255, 0, 0),
+    (0, 255, 0),
+    (255, 255, 0),
+    (92, 92, 255),
+    (255, 0, 255),
+    (0, 255, 255),
+    (255, 255, 255),
+)
+
+
+def color_distance(r1: int, g1: int, b1: int, r2: int, g2: int, b2: int) -> int:
+    """
+    Perceptual distance between two colors.
+
+    Uses the "redmean" weighted Euclidean distance (squared), which tracks
+    perceived differences much better than plain RGB distance at the cost of
+    a few integer operations.
+    """
+    rmean = (r1 + r2) >> 1
+    dr, dg, db = r1 - r2, g1 - g2, b1 - b2
+    return (
+        (((512 + rmean) * dr * dr) >> 8)
+        + 4 * dg * dg
+        + (((767 - rmean) * db * db) >> 8)
+    )
+
+
+@lru_cache(maxsize=None)
+def _bracket(value: int, levels: tuple[int, ...]) -> tuple[int, ...]:
+    """Indices of the levels directly below and above a value."""
+    for i, level in enumerate(levels):
+        if level >= value:
+            return (i,) if i == 0 or level == value else (i - 1, i)
+    return (len(levels) - 1,)
+
+
+@lru_cache(maxsize=None)
+def _nearest_level(value: int, levels: tuple[int, ...]) -> int:
+    """Index of the level closest to a value."""
+    return min(range(len(levels)), key=lambda i: abs(levels[i] - value))
+
+
+def nearest_256(r: int, g: int, b: int) -> int:
+    """
+    Find the nearest entry of the xterm 256-color palette.
+
+    The 16 ANSI colors are skipped because terminals let users redefine
+    them. The channel weights of color_distance() only depend on red, so for
+    each candidate red level the closest green and blue levels are simply
+    the nearest ones. That leaves two cube and two gray entries to compare.
+    """
+    gi = _nearest_level(g, CUBE_LEVELS)
+    bi = _nearest_level(b, CUBE_LEVELS)
+    best_index, best_distance = 16, None
+    for ri in _bracket(r, CUBE_LEVELS):
+        distance = color_distance(
+            r, g, b, CUBE_LEVELS[ri], CUBE_LEVELS[gi], CUBE_LEVELS[bi]
+        )
+        if best_distance is None or distance < best_distance:
+            best_index, best_distance = 16 + 36 * ri + 6 * gi + bi, distance
+
+    # Gray closest under the (approximate) channel weights of color_distance()
+    for i in _bracket((2 * r + 4 * g + 3 * b) // 9, GRAY_LEVELS):
+        level = GRAY_LEVELS[i]
+        distance = color_distance(r, g, b, level, level, level)
+        if distance < best_distance:
+            best_index, best_distance = 232 + i, distance
+
+    return best_index
+
+
+def nearest_16(r: int, g: int, b: int) -> int:
+    """Find the nearest of the 16 ANSI colors."""
+    return min(
+        range(len(ANSI_COLORS)),
+        key=lambda i: color_distance(r, g, b, *ANSI_COLORS[i]),
+    )
+
+
+def palette_color(index: int) -> int:
+    """Get the packed 0xRRGGBB color of an entry of the 256-color palette."""
+    if index < 16:
+        r, g, b = ANSI_COLORS[index]
+    elif index < 232:
+        index -= 16
+        r, g, b = (
+            CUBE_LEVELS[index // 36],
+            CUBE_LEVELS[index // 6 % 6],
+            CUBE_LEVELS[index % 6],
+        )
+    else:
+        r = g = b = GRAY_LEVELS[index - 232]
+    return (r << 16) | (g << 8) | b
+
+
+class QuantizationTable:
+    """
+    Nearest-color lookup table for a fixed palette.
+
+    Every channel is reduced to ``bits`` bits and the nearest palette index
+    of each resulting bin is computed once, so quantizing a color is a single
+    table lookup.
+    """
+
+    def __init__(self, bits: int, nearest: Callable[[int, int, int], int]):
+        self.bits = bits
+        self.shift = 8 - bits
+        self.mask = (1 << bits) - 1
+
+        # Quantize the center of each bin
+        half = 1 << (self.shift - 1)
+        centers = [(i << self.shift) + half for i in range(1 << bits)]
+        self.table = array(
+            "B", (nearest(r, g, b) for r in centers for g in centers for b in centers)
+        )
+
+    def lookup(self, color: int) -> int:
+        """Get the palette index nearest to a packed 0xRRGGBB color."""
+        shift, mask, bits = self.shift, self.mask, self.bits
+        return self.table[
+            ((color >> (16 + shift)) & mask) << (2 * bits)
+            | ((color >> (8 + shift)) & mask) << bits
+            | (color & 0xFF) >> shift
+        ]
+
+
+@lru_cache(maxsize=None)
+def quantization_table(color_mode: str) -> QuantizationTable:
+    """Get the shared lookup table of a color mode, building it on first use."""
+    if color_mode == "256":
+        return QuantizationTable(5, nearest_256)
+    if color_mode == "basic":
+        return QuantizationTable(4, nearest_16)
+    raise ValueError(f"No palette to quantize to in color mode '{color_mode}'")
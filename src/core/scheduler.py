@@ -0,0 +1,134 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Default time between two frames, in seconds (60 frames per second)
+DEFAULT_FRAME_INTERVAL = 1 / 60
+
+
+@dataclass
+class SchedulerStats:
+    """Counters of the frame scheduler since it was created"""
+
+    requests: int = 0
+    coalesced: int = 0
+    frames: int = 0
+    # Slots skipped because the output had not taken the previous frame yet
+    dropped: int = 0
+    # Frames that carried the changes of dropped ones
+    merged: int = 0
+    missed_deadlines: int = 0
+    last_frame_duration: float = 0.0
+    last_lateness: float = 0.0
+
+
+class FrameScheduler:
+    """
+    Paces rendering to at most one frame per frame interval.
+
+    Code that changed something calls request() instead of rendering right
+    away. Requests arriving while a frame is already pending are merged into
+    it, and a frame is never produced earlier than one interval after the
+    previous one, so bursts of updates cost one frame per interval and no
+    frame is rendered without a request.
+
+    A frame is due at the first slot after its request and should be on
+    screen one interval later. Frames finishing after that deadline are
+    counted as missed and reported to on_missed_deadline.
+
+    The render function may decline a frame by returning False, e.g. while
+    the terminal is still busy with the last one. The frame then stays
+    pending for the next slot, so the frame rate drops to what the output
+    can take and everything changed meanwhile goes out in one frame.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[], None],
+        frame_interval: float = DEFAULT_FRAME_INTERVAL,
+        on_missed_deadline: Optional[Callable[[float], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            render: Produces one frame, or returns False to skip the slot
+            frame_interval: Minimum time between two frames in seconds
+            on_missed_deadline: Called with the seconds a frame was late by
+            clock: Monotonic time source
+        """
+        self.render = render
+        self.frame_interval = frame_interval
+        self.on_missed_deadline = on_missed_deadline
+        self.clock = clock
+        self.stats = SchedulerStats()
+        self._pending = False
+        self._due = 0.0
+        self._last_slot: Optional[float] = None
+        # Whether the pending frame replaces dropped ones
+        self._dropped = False
+
+    @property
+    def pending(self) -> bool:
+        """Whether a frame has been requested but not rendered yet"""
+        return self._pending
+
+    def request(self) -> None:
+        """Ask for a frame, merging with one that is already pending"""
+        self.stats.requests += 1
+        if self._pending:
+            self.stats.coalesced += 1
+            return
+
+        self._pending = True
+        now = self.clock()
+        if self._last_slot is None:
+            self._due = now
+        else:
+            self._due = max(now, self._last_slot + self.frame_interval)
+
+    def time_until_due(self) -> Optional[float]:
+        """Seconds until the pending frame is due, None if nothing is pending"""
+        if not self._pending:
+            return None
+        return max(0.0, self._due - self.clock())
+
+    def tick(self) -> bool:
+        """
+        Render the pending frame if it is due.
+
+        Returns:
+            Whether a frame was rendered, False if none was due or the
+            render function declined it
+        """
+        if not self._pending:
+            return False
+        start = self.clock()
+        if start < self._due:
+            return False
+
+        # Keep frames on a steady grid unless we fell a whole interval behind
+        lateness = start - self._due
+        self._last_slot = self._due if lateness < self.frame_interval else start
+        self._pending = False
+
+        rendered = self.render() is not False
+
+        stats = self.stats
+        if not rendered:
+            # Keep the frame pending and retry at the next slot
+            stats.dropped += 1
+            self._dropped = self._pending = True
+            self._due = self._last_slot + self.frame_interval
+            return False
+        if self._dropped:
+            stats.merged += 1
+            self._dropped = False
+        stats.frames += 1
+        stats.last_frame_duration = self.clock() - start
+        late_by = lateness + stats.last_frame_duration - self.frame_interval
+        stats.last_lateness = max(0.0, late_by)
+        if late_by > 0:
+            stats.missed_deadlines += 1
+            if self.on_missed_deadline:
+                self.on_missed_deadline(late_by)
+        return True
@@ -1,27 +1,485 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, bulk operations fall back to array
+    np = None
+
+# Colors are stored packed as 0xRRGGBB; DEFAULT_COLOR leaves the terminal's own.
+DEFAULT_COLOR = -1
+
+# Cell attribute flags
+ATTR_BOLD = 1 << 0
+ATTR_DIM = 1 << 1
+ATTR_ITALIC = 1 << 2
+ATTR_UNDERLINE = 1 << 3
+ATTR_BLINK = 1 << 4
+ATTR_REVERSE = 1 << 5
+ATTR_STRIKE = 1 << 6
+
+# SGR parameters that switch each attribute on and off
+ATTR_SGR_CODES = (
+    (ATTR_BOLD, 1, 22),
+    (ATTR_DIM, 2, 22),
+    (ATTR_ITALIC, 3, 23),
+    (ATTR_UNDERLINE, 4, 24),
+    (ATTR_BLINK, 5, 25),
+    (ATTR_REVERSE, 7, 27),
+    (ATTR_STRIKE, 9, 29),
+)
+
+SPACE = ord(" ")
+
+# Smaller copies are faster as array slices than through NumPy views
+NUMPY_MIN_CELLS = 256
+
+
 class ScreenBuffer:
+    """
+    Character grid stored as parallel typed arrays.
+
+    Every cell is described by four fields kept in separate arrays: the code
+    point, the packed foreground and background colors and the attribute
+    flags. Cells are laid out row-major, so cell (x, y) lives at index
+    ``y * width + x`` in each array.
+
+    Writes that change a cell extend the damaged column span of its row,
+    which take_damage() hands out as rectangles. Nothing else is recorded
+    per write; finding the exact changes is left to the frame diff.
+    """
+
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-        self.buffer = [[" " for _ in range(width)] for _ in range(height)]
-        self.changes = {}
+        size = width * height
+        self.chars = array("I", [SPACE]) * size
+        self.fg = array("i", [DEFAULT_COLOR]) * size
+        self.bg = array("i", [DEFAULT_COLOR]) * size
+        self.attrs = array("B", [0]) * size
+        # Damaged [x0, x1) column span per row, a fresh buffer is all damaged
+        self.damage: dict[int, list[int]] = {}
+        self.mark_damaged(0, 0, width, height)
+
+    def set_cell(
+        self,
+        x: int,
+        y: int,
+        char,
+        fg: int = DEFAULT_COLOR,
+        bg: int = DEFAULT_COLOR,
+        attrs: int = 0,
+    ):
+        """
+        Set all fields of a cell and track the damage.
+
+        Args:
+            x, y: Cell coordinates
+            char: Single character or its code point
+            fg: Packed 0xRRGGBB foreground color or DEFAULT_COLOR
+            bg: Packed 0xRRGGBB background color or DEFAULT_COLOR
+            attrs: Combination of ATTR_* flags
+        """
+        code = char if isinstance(char, int) else ord(char)
+        i = y * self.width + x
+        if (
+            self.chars[i] != code
+            or self.fg[i] != fg
+            or self.bg[i] != bg
+            or self.attrs[i] != attrs
+        ):
+            self.chars[i] = code
+            self.fg[i] = fg
+            self.bg[i] = bg
+            self.attrs[i] = attrs
+
+            span = self.damage.get(y)
+            if span is None:
+                self.damage[y] = [x, x + 1]
+            elif x < span[0]:
+                span[0] = x
+            elif x >= span[1]:
+                span[1] = x + 1
+
+    def get_cell(self, x: int, y: int) -> tuple[int, int, int, int]:
+        """Get the (code point, fg, bg, attrs) fields of a cell."""
+        i = y * self.width + x
+        return self.chars[i], self.fg[i], self.bg[i], self.attrs[i]
 
     def set_char(self, x: int, y: int, char: str):
-        """Set a character in the buffer and track the change."""
-        if self.buffer[y][x] != char:
-            self.buffer[y][x] = char
-            self.changes[(y, x)] = char
+        """Set a plain, uncolored character in the buffer and track the damage."""
+        self.set_cell(x, y, char)
+
+    def get_char(self, x: int, y: int) -> str:
+        """Get character at specified position."""
+        return chr(self.chars[y * self.width + x])
+
+    def is_blank(self, x: int, y: int) -> bool:
+        """Check whether a cell is an uncolored space without attributes."""
+        i = y * self.width + x
+        return (
+            self.chars[i] == SPACE
+            and self.fg[i] == DEFAULT_COLOR
+            and self.bg[i] == DEFAULT_COLOR
+            and not self.attrs[i]
+        )
+
+    def fill(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        char=None,
+        fg: int = None,
+        bg: int = None,
+        attrs: int = None,
+    ):
+        """
+        Give every cell of a rectangle the same fields and track the damage.
+
+        The rectangle is clipped once and each row is written with one slice
+        assignment per field, so the cost grows with the number of rows rather
+        than cells. Fields passed as None are left untouched.
+
+        Args:
+            x, y: Top left corner of the rectangle
+            width, height: Size of the rectangle
+            char: Single character or its code point
+            fg: Packed 0xRRGGBB foreground color or DEFAULT_COLOR
+            bg: Packed 0xRRGGBB background color or DEFAULT_COLOR
+            attrs: Combination of ATTR_* flags
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.width), min(y + height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        if isinstance(char, str):
+            char = ord(char)
+        w = x1 - x0
+        spans = [
+            (target, array(target.typecode, [value]) * w)
+            for target, value in zip(
+                (self.chars, self.fg, self.bg, self.attrs),
+                (char, fg, bg, attrs),
+                strict=True,
+            )
+            if value is not None
+        ]
+
+        for row in range(y0, y1):
+            start = row * self.width + x0
+            end = start + w
+            changed = False
+            for target, span in spans:
+                if target[start:end] != span:
+                    target[start:end] = span
+                    changed = True
+            if changed:
+                # The frame diff narrows the span down to the changed cells
+                self.mark_damaged(x0, row, w, 1)
+
+    def fill_span(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        char=None,
+        fg: int = None,
+        bg: int = None,
+        attrs: int = None,
+    ):
+        """Give every cell of a horizontal span the same fields, see fill()."""
+        self.fill(x, y, width, 1, char, fg, bg, attrs)
+
+    def mark_damaged(self, x: int, y: int, width: int, height: int):
+        """Mark a rectangle as damaged, clipped to the buffer."""
+        x0, x1 = max(x, 0), min(x + width, self.width)
+        if x0 >= x1:
+            return
+        for row in range(max(y, 0), min(y + height, self.height)):
+            span = self.damage.get(row)
+            if span is None:
+                self.damage[row] = [x0, x1]
+            else:
+                span[0] = min(span[0], x0)
+                span[1] = max(span[1], x1)
+
+    def take_damage(self) -> list[tuple[int, int, int, int]]:
+        """
+        Get the damaged regions and reset the damage tracking.
+
+        Returns:
+            (x, y, width, height) rectangles. Consecutive rows with the same
+            damaged span are merged into one rectangle.
+        """
+        rects = []
+        for y in sorted(self.damage):
+            x0, x1 = self.damage[y]
+            if rects:
+                rx, ry, rw, rh = rects[-1]
+                if ry + rh == y and rx == x0 and rw == x1 - x0:
+                    rects[-1] = (rx, ry, rw, rh + 1)
+                    continue
+            rects.append((x0, y, x1 - x0, 1))
+        self.damage = {}
+        return rects
+
+    def blit(self, x: int, y: int, width: int, height: int, chars, fg, bg, attrs):
+        """
+        Write a rectangle of cells in one call and track the damage.
+
+        Each field is either a single value for the whole rectangle or a 2D
+        array-like indexed [row][column]: a NumPy array, a buffer-protocol
+        object with a 2D shape, or a sequence of rows. Characters may be given
+        as code points or as strings, colors as packed ints or, with NumPy, as
+        arrays with a trailing (r, g, b) axis. The rectangle is clipped to the
+        buffer.
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, self.width), min(y + height, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        if isinstance(chars, str):
+            chars = ord(chars)
+        fields = (self.chars, self.fg, self.bg, self.attrs)
+        sources = (chars, fg, bg, attrs)
+        if np is not None:
+            self._blit_numpy(fields, sources, x0, y0, x1, y1, x0 - x, y0 - y)
+        else:
+            self._blit_rows(fields, sources, x0, y0, x1, y1, x0 - x, y0 - y)
+
+    def _blit_numpy(self, fields, sources, x0, y0, x1, y1, sx, sy):
+        """Vectorized blit through NumPy views of the cell arrays."""
+        h, w = y1 - y0, x1 - x0
+        changed = np.zeros((h, w), dtype=bool)
+
+        for target, source in zip(fields, sources, strict=True):
+            view = np.frombuffer(target, dtype=target.typecode)
+            view = view.reshape(self.height, self.width)[y0:y1, x0:x1]
+            if not isinstance(source, int):
+                source = np.asarray(source)
+                if source.dtype.kind == "U":
+                    if source.ndim == 1:  # Rows given as strings
+                        source = np.array([list(row) for row in source])
+                    source = np.ascontiguousarray(source, dtype="U1").view(np.uint32)
+                elif source.ndim == 3:  # Trailing (r, g, b) axis
+                    source = source.astype(np.int32)
+                    source = source[..., 0] << 16 | source[..., 1] << 8 | source[..., 2]
+                source = source[sy : sy + h, sx : sx + w]
+            changed |= view != source
+            view[...] = source
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        first = changed.argmax(axis=1)
+        last = w - changed[:, ::-1].argmax(axis=1)
+        for row in rows.tolist():
+            span_start, span_end = int(first[row]), int(last[row])
+            self.mark_damaged(x0 + span_start, y0 + row, span_end - span_start, 1)
+
+    def _blit_rows(self, fields, sources, x0, y0, x1, y1, sx, sy):
+        """Row by row blit using array slices."""
+        w = x1 - x0
+        prepared = []
+        for target, source in zip(fields, sources, strict=True):
+            if isinstance(source, int):
+                fill = array(target.typecode, [source]) * w
+                prepared.append((target.typecode, None, fill))
+                continue
+            if not isinstance(source, (list, tuple)):
+                source = memoryview(source).tolist()
+            prepared.append((target.typecode, source, None))
+
+        for row in range(y1 - y0):
+            values = []
+            for typecode, source, fill in prepared:
+                if source is None:
+                    values.append(fill)
+                    continue
+                cells = source[sy + row][sx : sx + w]
+                if typecode == "I":  # Characters, as strings or code points
+                    cells = [ord(c) if isinstance(c, str) else c for c in cells]
+                values.append(array(typecode, cells))
+            start = (y0 + row) * self.width + x0
+            self._write_span(start, start + w, fields, values)
+
+    def _write_span(self, start: int, end: int, fields, values):
+        """Replace the cells in [start, end) with the given field arrays."""
+        if any(len(new) != end - start for new in values):
+            raise ValueError("Source rows must cover the whole span")
+
+        changed = set()
+        for target, new in zip(fields, values, strict=True):
+            old = target[start:end]
+            if old != new:
+                changed.update(
+                    i for i, (a, b) in enumerate(zip(old, new, strict=True)) if a != b
+                )
+                target[start:end] = new
+
+        if changed:
+            y, x = divmod(start, self.width)
+            self.mark_damaged(x + min(changed), y, max(changed) - min(changed) + 1, 1)
+
+    def copy_from(
+        self,
+        source: "ScreenBuffer",
+        sx: int,
+        sy: int,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        blank_bg: int = DEFAULT_COLOR,
+        transparent: bool = False,
+    ):
+        """
+        Copy a rectangle of another buffer into this one and track the damage.
+
+        Rows are copied as slices of the cell arrays, with one damage mark
+        per row that changed. The rectangle must lie within both buffers.
+
+        Args:
+            source: Buffer to copy from
+            sx, sy: Top left corner in the source
+            x, y: Top left corner in this buffer
+            width, height: Size of the rectangle
+            blank_bg: Background given to blank source cells
+            transparent: Leave the cells under blank source cells untouched
+        """
+        if width <= 0 or height <= 0:
+            return
+        if np is not None and width * height >= NUMPY_MIN_CELLS:
+            self._copy_numpy(source, sx, sy, x, y, width, height, blank_bg, transparent)
+            return
+
+        fields = (self.chars, self.fg, self.bg, self.attrs)
+        for row in range(height):
+            start = (sy + row) * source.width + sx
+            end = start + width
+            chars, fg = source.chars[start:end], source.fg[start:end]
+            bg, attrs = source.bg[start:end], source.attrs[start:end]
+            target = (y + row) * self.width + x
+            if transparent or blank_bg != DEFAULT_COLOR:
+                blank = [
+                    c == SPACE and f == DEFAULT_COLOR and b == DEFAULT_COLOR and not a
+                    for c, f, b, a in zip(chars, fg, bg, attrs, strict=True)
+                ]
+                if transparent:
+                    old = [field[target : target + width] for field in fields]
+                    chars, fg, bg, attrs = (
+                        array(
+                            new.typecode,
+                            [
+                                k if b else n
+                                for b, k, n in zip(blank, kept, new, strict=True)
+                            ],
+                        )
+                        for kept, new in zip(old, (chars, fg, bg, attrs), strict=True)
+                    )
+                else:
+                    bg = array(
+                        "i",
+                        [blank_bg if b else c for b, c in zip(blank, bg, strict=True)],
+                    )
+            self._replace_span(target, x, y + row, (chars, fg, bg, attrs))
+
+    def _copy_numpy(self, source, sx, sy, x, y, width, height, blank_bg, transparent):
+        """Vectorized copy_from() through NumPy views of the cell arrays."""
+        views = [
+            np.frombuffer(field, dtype=field.typecode).reshape(
+                source.height, source.width
+            )[sy : sy + height, sx : sx + width]
+            for field in (source.chars, source.fg, source.bg, source.attrs)
+        ]
+        chars, fg, bg, attrs = views
+        if transparent or blank_bg != DEFAULT_COLOR:
+            blank = (
+                (chars == SPACE)
+                & (fg == DEFAULT_COLOR)
+                & (bg == DEFAULT_COLOR)
+                & (attrs == 0)
+            )
+            if transparent:
+                targets = [
+                    np.frombuffer(field, dtype=field.typecode).reshape(
+                        self.height, self.width
+                    )[y : y + height, x : x + width]
+                    for field in (self.chars, self.fg, self.bg, self.attrs)
+                ]
+                views = [
+                    np.where(blank, kept, new)
+                    for kept, new in zip(targets, views, strict=True)
+                ]
+            else:
+                views[2] = np.where(blank, blank_bg, bg)
+        self._blit_numpy(
+            (self.chars, self.fg, self.bg, self.attrs),
+            views,
+            x,
+            y,
+            x + width,
+            y + height,
+            0,
+            0,
+        )
+
+    def _replace_span(self, start: int, x: int, y: int, values):
+        """Write whole field slices at start and mark the row if anything changed"""
+        end = start + len(values[0])
+        changed = False
+        for target, new in zip(
+            (self.chars, self.fg, self.bg, self.attrs), values, strict=True
+        ):
+            if target[start:end] != new:
+                target[start:end] = new
+                changed = True
+        if changed:
+            self.mark_damaged(x, y, end - start, 1)
 
     def clear(self):
         """Clear the screen buffer."""
-        self.buffer = [[" " for _ in range(self.width)] for _ in range(self.height)]
-        self.changes.clear()
+        size = self.width * self.height
+        self.chars[:] = array("I", [SPACE]) * size
+        self.fg[:] = array("i", [DEFAULT_COLOR]) * size
+        self.bg[:] = array("i", [DEFAULT_COLOR]) * size
+        self.attrs[:] = array("B", [0]) * size
+        self.mark_damaged(0, 0, self.width, self.height)
 
-    def get_char(self, x: int, y: int) -> str:
-        """Get character at specified position."""
-        return self.buffer[y][x]
+    def resize(self, width: int, height: int):
+        """
+        Change the size of the buffer, keeping the cells both sizes share.
+
+        Rows are copied over with one slice per field. Cells that were cut
+        off are dropped along with their damage; cells that were added are
+        blank and damaged.
+        """
+        if (width, height) == (self.width, self.height):
+            return
+        old_width, old_height = self.width, self.height
+        keep_width, keep_height = min(width, old_width), min(height, old_height)
+        size = width * height
+
+        for name, typecode, blank in (
+            ("chars", "I", SPACE),
+            ("fg", "i", DEFAULT_COLOR),
+            ("bg", "i", DEFAULT_COLOR),
+            ("attrs", "B", 0),
+        ):
+            old = getattr(self, name)
+            new = array(typecode, [blank]) * size
+            for row in range(keep_height):
+                new[row * width : row * width + keep_width] = old[
+                    row * old_width : row * old_width + keep_width
+                ]
+            setattr(self, name, new)
 
-    def get_changes(self) -> dict:
-        """Get current changes and clear the change tracking."""
-        changes = self.changes.copy()
-        self.changes.clear()
-        return changes
+        self.width, self.height = width, height
+        damage = {}
+        for row, (x0, x1) in self.damage.items():
+            if row < height and x0 < width:
+                damage[row] = [x0, min(x1, width)]
+        self.damage = damage
+        self.mark_damaged(old_width, 0, width - old_width, keep_height)
+        self.mark_damaged(0, old_height, width, height - old_height)
@@ -1,47 +1,96 @@
+import io
 import os
+import sys
+from typing import Optional
 
+from core.backend import TerminalBackend
+from core.output import OutputWriter, StreamWriter
 
-class TerminalController:
-    def __init__(self) -> None:
-        self._hide_cursor()
-        self._save_cursor()
-        self._use_alternate_screen()
+# Size reported when no standard stream is a terminal
+DEFAULT_SIZE = (80, 24)
 
-    def __del__(self):
-        self._show_cursor()
-        self._restore_cursor()
-        # self._use_main_screen()
-        # pass
-
-    def _hide_cursor(self):
-        """Hide the terminal cursor."""
-        print("\033[?25l", end="", flush=True)
 
-    def _show_cursor(self):
-        """Show the terminal cursor."""
-        print("\033[?25h", end="", flush=True)
+class TerminalController(TerminalBackend):
+    """
+    Backend of the real terminal, writing to stdout.
 
-    def _save_cursor(self):
-        """Save cursor position."""
-        print("\033[s", end="", flush=True)
+    Output bypasses sys.stdout and goes to its file descriptor, one
+    os.write() per frame. Frames use synchronized updates by default, which
+    terminals without support ignore.
 
-    def _restore_cursor(self):
-        """Restore cursor position."""
-        print("\033[u", end="", flush=True)
+    When stdout is a terminal, output goes through a non-blocking descriptor
+    of its own, so a slow link (e.g. SSH) never stalls the UI inside a write.
+    Opening the device again keeps stdin, which shares stdout's descriptor
+    flags, blocking. A stdout without a descriptor, e.g. io.StringIO, is
+    written through its own write() and flush() instead.
+    """
 
-    def _use_alternate_screen(self):
-        """Switch to alternate screen buffer."""
-        print("\033[?1049h", end="", flush=True)
+    def __init__(self, synchronized_output: bool = True, nonblocking: bool = True):
+        super().__init__(synchronized_output)
+        self._own_fd = None
+        try:
+            fd = sys.stdout.fileno()
+        except (OSError, io.UnsupportedOperation, AttributeError):
+            self.output = StreamWriter(sys.stdout)
+            return
+        if nonblocking and os.isatty(fd):
+            try:
+                fd = self._own_fd = os.open(
+                    os.ttyname(fd), os.O_WRONLY | os.O_NOCTTY | os.O_NONBLOCK
+                )
+            except OSError:
+                pass  # Keep writing to stdout, blocking
+        self.output = OutputWriter(fd)
 
-    def _use_main_screen(self):
-        """Switch back to main screen buffer."""
-        print("\033[?1049l", end="", flush=True)
+    def __del__(self):
+        # __init__ may have failed before the output was set up
+        if getattr(self, "output", None) is not None:
+            self.leave()
+        if getattr(self, "_own_fd", None) is not None:
+            os.close(self._own_fd)
+            self._own_fd = None
 
     def get_size(self):
-        """Get the terminal size (columns, rows)."""
-        rows, columns = os.popen("stty size", "r").read().split()
-        return int(columns), int(rows)
+        """
+        Get the terminal size (columns, rows).
+
+        Asks the terminal driver directly (TIOCGWINSZ), which is cheap enough
+        to call on every resize, unlike running stty in a subprocess.
+        """
+        for stream in (sys.stdout, sys.stdin, sys.stderr):
+            try:
+                columns, rows = os.get_terminal_size(stream.fileno())
+            except (AttributeError, OSError, ValueError):
+                continue  # Redirected, closed or replaced stream
+            if columns and rows:  # Unconfigured ptys report 0x0
+                return columns, rows
+        return DEFAULT_SIZE
+
+    def write(self, data: bytes) -> int:
+        """Write encoded output and return the number of os.write() calls."""
+        if not data:
+            return 0
+        # Text printed before must not arrive after the output
+        sys.stdout.flush()
+        return self.output.write(data)
+
+    def ready(self) -> bool:
+        output = getattr(self, "output", None)
+        if output is None:
+            return True
+        if output.pending:
+            output.flush()
+        return not output.pending
+
+    def pending_fd(self) -> Optional[int]:
+        output = getattr(self, "output", None)
+        if output is None or not output.pending:
+            return None
+        return output.fd
 
-    def clear_screen(self):
-        """Clear the terminal screen."""
-        os.system("cls" if os.name == "nt" else "clear")
+    def leave(self) -> None:
+        super().leave()
+        # Restoring the terminal must not be left pending at exit
+        output = getattr(self, "output", None)
+        if output is not None:
+            output.drain()
@@ -0,0 +1,368 @@
+import codecs
+from typing import Optional
+
+from core.backend import TerminalBackend
+from core.palette import palette_color
+from core.screen_buffer import (
+    ATTR_BOLD,
+    ATTR_DIM,
+    ATTR_SGR_CODES,
+    DEFAULT_COLOR,
+    ScreenBuffer,
+)
+
+# Parser states
+GROUND, ESCAPE, CSI, OSC, CHARSET = range(5)
+
+# Private modes with an effect on the screen
+MODE_CURSOR_VISIBLE = 25
+MODE_ALTERNATE_SCREEN = 1049
+
+# SGR parameters switching attributes on and off
+ATTR_ON = {on: flag for flag, on, _ in ATTR_SGR_CODES}
+ATTR_OFF = {
+    off: flag if off != 22 else ATTR_BOLD | ATTR_DIM for flag, _, off in ATTR_SGR_CODES
+}
+
+TAB_WIDTH = 8
+
+
+class VirtualScreen:
+    """
+    Cell grid that interprets terminal output like a VT100/xterm would.
+
+    Feeding it the bytes a UI wrote replays them into a ScreenBuffer, which
+    can then be compared with what the UI meant to show. It understands what
+    the encoder and the backends emit and common extras: cursor movement,
+    erasing, SGR attributes with 16, 256 and true colors, autowrap and
+    scrolling, saved cursors and private modes such as the alternate
+    screen. Anything else is parsed and ignored.
+
+    Palette colors are stored as the packed color of the xterm default
+    palette entry, so in true color mode the cells match the UI's buffer.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.main = ScreenBuffer(width, height)
+        self.alternate = ScreenBuffer(width, height)
+        self.buffer = self.main
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.cursor_visible = True
+        # Private modes currently set, e.g. 2004 for bracketed paste
+        self.modes: set[int] = set()
+        self.fg = DEFAULT_COLOR
+        self.bg = DEFAULT_COLOR
+        self.attrs = 0
+        self._saved_cursor: Optional[tuple[int, int]] = None
+        self._utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._state = GROUND
+        self._params = ""
+
+    def feed(self, data: bytes) -> None:
+        """Interpret a chunk of output; sequences may span chunks"""
+        for char in self._utf8.decode(data):
+            state = self._state
+            if state == GROUND:
+                if char >= " " and char != "\x7f":
+                    self._print(char)
+                elif char == "\x1b":
+                    self._state = ESCAPE
+                else:
+                    self._control(char)
+            elif state == ESCAPE:
+                self._escape(char)
+            elif state == CSI:
+                if "\x40" <= char <= "\x7e":  # Final character
+                    self._state = GROUND
+                    self._csi(self._params, char)
+                else:
+                    self._params += char
+            elif state == OSC:
+                # Operating system commands end with BEL or ESC \
+                if char == "\x07":
+                    self._state = GROUND
+                elif char == "\x1b":
+                    self._state = ESCAPE
+            else:  # CHARSET: designation character, ignored
+                self._state = GROUND
+
+    def resize(self, width: int, height: int) -> None:
+        """Change the size like a terminal window that clips its content"""
+        self.main.resize(width, height)
+        self.alternate.resize(width, height)
+        self.width, self.height = width, height
+        self._move_to(self.cursor_x, self.cursor_y)
+        if self._saved_cursor is not None:
+            x, y = self._saved_cursor
+            self._saved_cursor = (min(x, width - 1), min(y, height - 1))
+
+    def row_text(self, y: int) -> str:
+        """Characters of a row, trailing blanks included"""
+        start = y * self.width
+        return "".join(map(chr, self.buffer.chars[start : start + self.width]))
+
+    def text(self) -> list[str]:
+        """Characters of all rows, without trailing blanks"""
+        return [self.row_text(y).rstrip() for y in range(self.height)]
+
+    def get_cell(self, x: int, y: int) -> tuple[int, int, int, int]:
+        """Get the (code point, fg, bg, attrs) fields of a cell."""
+        return self.buffer.get_cell(x, y)
+
+    def _print(self, char: str) -> None:
+        if self.cursor_x >= self.width:
+            # Autowrap is deferred until the next character arrives
+            self.cursor_x = 0
+            self._line_feed()
+        self.buffer.set_cell(
+            self.cursor_x, self.cursor_y, char, self.fg, self.bg, self.attrs
+        )
+        self.cursor_x += 1
+
+    def _control(self, char: str) -> None:
+        if char == "\r":
+            self.cursor_x = 0
+        elif char in "\n\x0b\x0c":
+            self._line_feed()
+        elif char == "\b":
+            self.cursor_x = max(min(self.cursor_x, self.width - 1) - 1, 0)
+        elif char == "\t":
+            self.cursor_x = min(
+                (self.cursor_x // TAB_WIDTH + 1) * TAB_WIDTH, self.width - 1
+            )
+
+    def _line_feed(self) -> None:
+        if self.cursor_y < self.height - 1:
+            self.cursor_y += 1
+            return
+        # Scroll everything up a line
+        buffer, width = self.buffer, self.width
+        for field in (buffer.chars, buffer.fg, buffer.bg, buffer.attrs):
+            field[:-width] = field[width:]
+        buffer.fill(0, self.height - 1, width, 1, " ", DEFAULT_COLOR, self.bg, 0)
+        buffer.mark_damaged(0, 0, width, self.height)
+
+    def _escape(self, char: str) -> None:
+        self._state = GROUND
+        if char == "[":
+            self._state = CSI
+            self._params = ""
+        elif char == "]":
+            self._state = OSC
+        elif char in "()*+":
+            self._state = CHARSET
+        elif char == "7":
+            self._save_cursor()
+        elif char == "8":
+            self._restore_cursor()
+        elif char == "c":
+            self.__init__(self.width, self.height)
+
+    def _csi(self, params: str, final: str) -> None:
+        private = params.startswith("?")
+        if private:
+            params = params[1:]
+        try:
+            numbers = [int(param) if param else 0 for param in params.split(";")]
+        except ValueError:  # Intermediate characters or other private forms
+            return
+
+        if private:
+            if final in "hl":
+                for mode in numbers:
+                    self._set_mode(mode, final == "h")
+            return
+
+        first = numbers[0]
+        count = max(first, 1)
+        if final in "Hf":
+            row = count
+            column = max(numbers[1], 1) if len(numbers) > 1 else 1
+            self._move_to(column - 1, row - 1)
+        elif final == "A":
+            self._move_to(self.cursor_x, self.cursor_y - count)
+        elif final == "B":
+            self._move_to(self.cursor_x, self.cursor_y + count)
+        elif final == "C":
+            self._move_to(self.cursor_x + count, self.cursor_y)
+        elif final == "D":
+            self._move_to(min(self.cursor_x, self.width - 1) - count, self.cursor_y)
+        elif final == "G":
+            self._move_to(count - 1, self.cursor_y)
+        elif final == "d":
+            self._move_to(self.cursor_x, count - 1)
+        elif final == "J":
+            self._erase_display(first)
+        elif final == "K":
+            self._erase_line(first)
+        elif final == "m":
+            self._sgr(numbers)
+        elif final == "s":
+            self._save_cursor()
+        elif final == "u":
+            self._restore_cursor()
+
+    def _move_to(self, x: int, y: int) -> None:
+        self.cursor_x = max(0, min(x, self.width - 1))
+        self.cursor_y = max(0, min(y, self.height - 1))
+
+    def _erase(self, x: int, y: int, width: int, height: int) -> None:
+        """Blank cells like terminals do, keeping the current background"""
+        self.buffer.fill(x, y, width, height, " ", DEFAULT_COLOR, self.bg, 0)
+
+    def _erase_display(self, mode: int) -> None:
+        x, y = min(self.cursor_x, self.width - 1), self.cursor_y
+        if mode == 0:
+            self._erase_line(0)
+            self._erase(0, y + 1, self.width, self.height - y - 1)
+        elif mode == 1:
+            self._erase(0, 0, self.width, y)
+            self._erase(0, y, x + 1, 1)
+        else:
+            self._erase(0, 0, self.width, self.height)
+
+    def _erase_line(self, mode: int) -> None:
+        x, y = min(self.cursor_x, self.width - 1), self.cursor_y
+        if mode == 0:
+            self._erase(x, y, self.width - x, 1)
+        elif mode == 1:
+            self._erase(0, y, x + 1, 1)
+        else:
+            self._erase(0, y, self.width, 1)
+
+    def _sgr(self, numbers: list[int]) -> None:
+        i = 0
+        while i < len(numbers):
+            code = numbers[i]
+            if code == 0:
+                self.fg = self.bg = DEFAULT_COLOR
+                self.attrs = 0
+            elif code in ATTR_ON:
+                self.attrs |= ATTR_ON[code]
+            elif code in ATTR_OFF:
+                self.attrs &= ~ATTR_OFF[code]
+            elif 30 <= code <= 37:
+                self.fg = palette_color(code - 30)
+            elif 40 <= code <= 47:
+                self.bg = palette_color(code - 40)
+            elif 90 <= code <= 97:
+                self.fg = palette_color(code - 90 + 8)
+            elif 100 <= code <= 107:
+                self.bg = palette_color(code - 100 + 8)
+            elif code == 39:
+                self.fg = DEFAULT_COLOR
+            elif code == 49:
+                self.bg = DEFAULT_COLOR
+            elif code in (38, 48):
+                color, i = self._extended_color(numbers, i)
+                if color is not None:
+                    if code == 38:
+                        self.fg = color
+                    else:
+                        self.bg = color
+            i += 1
+
+    @staticmethod
+    def _extended_color(numbers: list[int], i: int) -> tuple[Optional[int], int]:
+        """Color of "38;5;n" or "38;2;r;g;b" at numbers[i], and its last index"""
+        kind = numbers[i + 1] if i + 1 < len(numbers) else None
+        if kind == 5 and i + 2 < len(numbers):
+            return palette_color(numbers[i + 2] & 0xFF), i + 2
+        if kind == 2 and i + 4 < len(numbers):
+            r, g, b = (value & 0xFF for value in numbers[i + 2 : i + 5])
+            return (r << 16) | (g << 8) | b, i + 4
+        return None, len(numbers)
+
+    def _set_mode(self, mode: int, enabled: bool) -> None:
+        if enabled:
+            self.modes.add(mode)
+        else:
+            self.modes.discard(mode)
+
+        if mode == MODE_CURSOR_VISIBLE:
+            self.cursor_visible = enabled
+        elif mode == MODE_ALTERNATE_SCREEN:
+            if enabled and self.buffer is self.main:
+                self._save_cursor()
+                self.buffer = self.alternate
+                self._erase(0, 0, self.width, self.height)
+            elif not enabled and self.buffer is self.alternate:
+                self.buffer = self.main
+                self._restore_cursor()
+
+    def _save_cursor(self) -> None:
+        self._saved_cursor = (self.cursor_x, self.cursor_y)
+
+    def _restore_cursor(self) -> None:
+        if self._saved_cursor is not None:
+            self.cursor_x, self.cursor_y = self._saved_cursor
+
+
+class MemoryTerminal(TerminalBackend):
+    """
+    Backend of a terminal that exists only in memory.
+
+    Lets a TerminalUI run offscreen, e.g. in benchmarks and tests: nothing
+    is printed and no subprocess is started. Output is counted, optionally
+    kept, and replayed into a VirtualScreen so what a real terminal would
+    show can be checked cell by cell.
+    """
+
+    def __init__(
+        self,
+        width: int = 80,
+        height: int = 24,
+        emulate: bool = True,
+        keep_output: bool = False,
+        synchronized_output: bool = False,
+    ) -> None:
+        """
+        Args:
+            width, height: Size reported to the UI
+            emulate: Replay the output into `screen`; turn off to measure
+                only the cost of producing it
+            keep_output: Collect everything written in `output`
+            synchronized_output: Wrap frames in synchronized update markers
+                like the real terminal's backend does
+        """
+        super().__init__(synchronized_output)
+        self.width = width
+        self.height = height
+        self.screen: Optional[VirtualScreen] = (
+            VirtualScreen(width, height) if emulate else None
+        )
+        self.output: Optional[bytearray] = bytearray() if keep_output else None
+        self.bytes_written = 0
+        self.writes = 0
+        # Set to False to act like a terminal that stopped reading output
+        self.writable = True
+
+    def get_size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Change the reported size, as if the terminal window was resized.
+
+        Real terminals send SIGWINCH; call TerminalUI.resize() afterwards.
+        """
+        self.width, self.height = width, height
+        if self.screen is not None:
+            self.screen.resize(width, height)
+
+    def ready(self) -> bool:
+        return self.writable
+
+    def write(self, data: bytes) -> int:
+        if not data:
+            return 0
+        self.bytes_written += len(data)
+        self.writes += 1
+        if self.output is not None:
+            self.output += data
+        if self.screen is not None:
+            self.screen.feed(data)
+        return 1
@@ -4,8 +4,14 @@ from .primitives import DrawingPrimitives
 class ComplexShapes:
     def __init__(self, primitives: DrawingPrimitives):
         self.primitives = primitives
-        self.width = primitives.width
-        self.height = primitives.height
+
+    @property
+    def width(self) -> int:
+        return self.primitives.width
+
+    @property
+    def height(self) -> int:
+        return self.primitives.height
 
     def draw_rectangle(
         self,
@@ -18,10 +24,11 @@ class ComplexShapes:
         border: bool = True,
     ):
         """Draw a rectangle with optional border and fill."""
-        # Draw fill
-        for dy in range(height):
-            for dx in range(width):
-                self.primitives.draw_at(x + dx, y + dy, fill, color)
+        # Draw fill, a space fill is a square of the given color
+        if fill == " ":
+            self.primitives.fill_rect(x, y, width, height, fill, bg=color)
+        else:
+            self.primitives.fill_rect(x, y, width, height, fill)
 
         # Draw border if requested
         if border:
@@ -49,16 +56,16 @@ class ComplexShapes:
         )
 
         # Draw edges
-        for dx in range(1, width - 1):
-            self.primitives.draw_char(x + dx, y, BOX["horizontal"], fg=fg, bg=bg)
-            self.primitives.draw_char(
-                x + dx, y + height - 1, BOX["horizontal"], fg=fg, bg=bg
-            )
-        for dy in range(1, height - 1):
-            self.primitives.draw_char(x, y + dy, BOX["vertical"], fg=fg, bg=bg)
-            self.primitives.draw_char(
-                x + width - 1, y + dy, BOX["vertical"], fg=fg, bg=bg
-            )
+        self.primitives.fill_row(x + 1, y, width - 2, BOX["horizontal"], fg=fg, bg=bg)
+        self.primitives.fill_row(
+            x + 1, y + height - 1, width - 2, BOX["horizontal"], fg=fg, bg=bg
+        )
+        self.primitives.fill_rect(
+            x, y + 1, 1, height - 2, BOX["vertical"], fg=fg, bg=bg
+        )
+        self.primitives.fill_rect(
+            x + width - 1, y + 1, 1, height - 2, BOX["vertical"], fg=fg, bg=bg
+        )
 
     def draw_matrix(
         self,
@@ -87,14 +94,8 @@ class ComplexShapes:
                 color = colors[row][col] if colors and colors[row][col] else "#FFFFFF"
 
                 # Draw cell (without borders)
-                self.draw_rectangle(
-                    cell_x,
-                    cell_y,
-                    cell_width,
-                    cell_height,
-                    fill=" ",
-                    color=color,
-                    border=False,
+                self.primitives.fill_rect(
+                    cell_x, cell_y, cell_width, cell_height, " ", bg=color
                 )
 
                 # Draw cell value
@@ -109,10 +110,12 @@ class ComplexShapes:
     ):
         """Draw a formatted table with headers and data."""
         if not col_widths:
-            col_widths = [
-                max(len(str(row[i])) for row in [headers] + data) + 2
-                for i in range(len(headers))
-            ]
+            # One pass over the rows, widening each column as needed
+            col_widths = [len(str(header)) for header in headers]
+            for row in data:
+                for i, cell in enumerate(row):
+                    col_widths[i] = max(col_widths[i], len(str(cell)))
+            col_widths = [width + 2 for width in col_widths]
 
         # Draw headers
         current_x = x
@@ -179,12 +182,12 @@ class ComplexShapes:
         self.primitives.draw_char(x + width - 1, y, "⟩")
 
         # Draw the filled portion
-        for i in range(filled_width):
-            self.primitives.draw_char(x + 1 + i, y, fill_char, fg=fg_color)
+        self.primitives.fill_row(x + 1, y, filled_width, fill_char, fg=fg_color)
 
         # Draw the empty portion
-        for i in range(filled_width, width - 2):
-            self.primitives.draw_char(x + 1 + i, y, empty_char, fg=bg_color)
+        self.primitives.fill_row(
+            x + 1 + filled_width, y, width - 2 - filled_width, empty_char, fg=bg_color
+        )
 
         # Draw percentage if requested
         if show_percentage:
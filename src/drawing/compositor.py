@@ -0,0 +1,258 @@
+from typing import TYPE_CHECKING, Optional
+
+from core.screen_buffer import DEFAULT_COLOR, ScreenBuffer
+
+if TYPE_CHECKING:
+    from ui.window import Window
+
+Rect = tuple[int, int, int, int]
+
+
+def intersect(a: Rect, b: Rect) -> Optional[Rect]:
+    """Intersection of two (x, y, width, height) rectangles, None if empty."""
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def subtract(rect: Rect, cutter: Rect) -> list[Rect]:
+    """Parts of a rectangle not covered by another, as up to four rectangles."""
+    overlap = intersect(rect, cutter)
+    if overlap is None:
+        return [rect]
+
+    x, y, width, height = rect
+    ox, oy, ow, oh = overlap
+    pieces = []
+    if oy > y:  # Above
+        pieces.append((x, y, width, oy - y))
+    if oy + oh < y + height:  # Below
+        pieces.append((x, oy + oh, width, y + height - oy - oh))
+    if ox > x:  # Left
+        pieces.append((x, oy, ox - x, oh))
+    if ox + ow < x + width:  # Right
+        pieces.append((ox + ow, oy, x + width - ox - ow, oh))
+    return pieces
+
+
+def subtract_all(rects: list[Rect], cutters: list[Rect]) -> list[Rect]:
+    """Parts of a set of rectangles not covered by any of the cutters."""
+    for cutter in cutters:
+        rects = [piece for rect in rects for piece in subtract(rect, cutter)]
+    return rects
+
+
+class Compositor:
+    """
+    Composites windows into the screen buffer in z-order.
+
+    Windows are kept bottom to top. For each window the compositor knows the
+    region that is not covered by an opaque window above it, and copies only
+    the damaged part of that region, so hidden windows cost nothing. Blank
+    cells of transparent windows show the windows below them.
+    """
+
+    def __init__(self):
+        self.windows: list["Window"] = []
+        self._layout = None
+        self._screen = None
+        self._visible: dict["Window", list[Rect]] = {}
+
+    def add(self, window: "Window") -> None:
+        """Add a window on top of all others"""
+        self.windows.append(window)
+
+    def remove(self, window: "Window") -> None:
+        if window in self.windows:
+            self.windows.remove(window)
+
+    def raise_window(self, window: "Window") -> None:
+        """Move a window one step up in the z-order"""
+        index = self.windows.index(window)
+        if index < len(self.windows) - 1:
+            self.windows[index], self.windows[index + 1] = (
+                self.windows[index + 1],
+                window,
+            )
+
+    def lower_window(self, window: "Window") -> None:
+        """Move a window one step down in the z-order"""
+        index = self.windows.index(window)
+        if index > 0:
+            self.windows[index], self.windows[index - 1] = (
+                self.windows[index - 1],
+                window,
+            )
+
+    def bring_to_front(self, window: "Window") -> None:
+        """Move a window above all others"""
+        self.windows.remove(window)
+        self.windows.append(window)
+
+    def send_to_back(self, window: "Window") -> None:
+        """Move a window below all others"""
+        self.windows.remove(window)
+        self.windows.insert(0, window)
+
+    def visible_region(self, window: "Window") -> list[Rect]:
+        """Screen rectangles of a window not hidden by opaque windows above it"""
+        return self._visible.get(window, [])
+
+    def paint(self, target: ScreenBuffer) -> dict["Window", list[Rect]]:
+        """
+        Let every window that can be seen bring its local buffer up to date.
+
+        Hidden windows are skipped, they are invalidated once uncovered.
+
+        Returns:
+            The damaged screen regions of each window, for composite()
+        """
+        windows = self.windows
+        layout = tuple((window, window.rect, window.transparent) for window in windows)
+        if layout != self._layout or (target.width, target.height) != self._screen:
+            self._update_layout(target, layout)
+
+        damage = {}
+        for window in windows:
+            if self.visible_region(window):
+                window.paint()
+                damage[window] = window.damaged_regions()
+            else:
+                damage[window] = []
+        return damage
+
+    def composite(
+        self, target: ScreenBuffer, damage: Optional[dict["Window", list[Rect]]] = None
+    ) -> None:
+        """
+        Copy the visible damage of all windows into the target.
+
+        Args:
+            target: Buffer to composite into, usually the screen
+            damage: Result of paint(), which is called if it is not given
+        """
+        if damage is None:
+            damage = self.paint(target)
+        windows = self.windows
+
+        # Changes to transparent windows must be recomposited from below
+        for index in range(len(windows) - 1, -1, -1):
+            window = windows[index]
+            if not window.transparent or not damage[window]:
+                continue
+            regions = self._clip(damage[window], self.visible_region(window))
+            below = windows[:index]
+            for lower in below:
+                for region in regions:
+                    overlap = intersect(region, lower.rect)
+                    if overlap:
+                        damage[lower].append(overlap)
+
+            # Screen areas with no window below go back to blank
+            for x, y, width, height in subtract_all(
+                regions, [lower.rect for lower in below]
+            ):
+                target.blit(x, y, width, height, " ", DEFAULT_COLOR, DEFAULT_COLOR, 0)
+
+        # Composite bottom to top, clipped to what is visible
+        written: list[Rect] = []
+        for window in windows:
+            regions = damage[window]
+            if window.transparent:
+                # Redraw over anything a lower window just wrote
+                regions = regions + [
+                    overlap
+                    for rect in written
+                    if (overlap := intersect(rect, window.rect)) is not None
+                ]
+            regions = self._clip(regions, self.visible_region(window))
+            if regions:
+                window.composite(target, regions)
+                written.extend(regions)
+
+    def _update_layout(self, target: ScreenBuffer, layout) -> None:
+        """
+        Recompute visible regions after windows or the screen changed.
+
+        Only the screen areas the change affected are composited again: the
+        old and new rects of windows that moved, resized, changed
+        transparency or were added or removed, and the overlaps of windows
+        that swapped places in the z-order. A new screen size recomposites
+        everything.
+        """
+        screen = (0, 0, target.width, target.height)
+        full = self._layout is None or self._screen != (target.width, target.height)
+
+        self._visible = {}
+        for index, (window, rect, _) in enumerate(layout):
+            visible = intersect(rect, screen)
+            opaque_above = [
+                above_rect
+                for _, above_rect, transparent in layout[index + 1 :]
+                if not transparent
+            ]
+            self._visible[window] = subtract_all(
+                [visible] if visible else [], opaque_above
+            )
+
+        if full:
+            changed = [rect for _, rect, _ in layout] + [
+                rect for _, rect, _ in self._layout or ()
+            ]
+        else:
+            changed = self._changed_areas(self._layout, layout)
+
+        # What became visible or moved has to be copied again
+        for window, rect, _ in layout:
+            for area in changed:
+                overlap = intersect(area, rect)
+                if overlap:
+                    window.invalidate(overlap)
+
+        # Clear changed areas no longer covered by any window
+        new_rects = [rect for _, rect, _ in layout]
+        for rect in subtract_all(changed, new_rects):
+            exposed = intersect(rect, screen)
+            if exposed:
+                target.blit(*exposed, " ", DEFAULT_COLOR, DEFAULT_COLOR, 0)
+
+        self._layout = layout
+        self._screen = (target.width, target.height)
+
+    @staticmethod
+    def _changed_areas(old_layout, new_layout) -> list[Rect]:
+        """Screen areas that may look different between two layouts"""
+        old = {window: (rect, transparent) for window, rect, transparent in old_layout}
+        new = {window: (rect, transparent) for window, rect, transparent in new_layout}
+        changed = []
+        for window in old.keys() | new.keys():
+            if old.get(window) != new.get(window):
+                changed.extend(
+                    entry[0] for entry in (old.get(window), new.get(window)) if entry
+                )
+
+        # Windows that swapped places in the z-order differ where they overlap
+        kept = [window for window, _, _ in new_layout if window in old]
+        old_order = {
+            window: index
+            for index, window in enumerate(w for w, _, _ in old_layout if w in new)
+        }
+        for index, lower in enumerate(kept):
+            for upper in kept[index + 1 :]:
+                if old_order[lower] > old_order[upper]:
+                    overlap = intersect(new[lower][0], new[upper][0])
+                    if overlap:
+                        changed.append(overlap)
+        return changed
+
+    @staticmethod
+    def _clip(regions: list[Rect], visible: list[Rect]) -> list[Rect]:
+        """Intersect damage rectangles with a visible region"""
+        return [
+            overlap
+            for region in regions
+            for area in visible
+            if (overlap := intersect(region, area)) is not None
+        ]
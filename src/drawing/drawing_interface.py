@@ -15,6 +15,9 @@ class DrawingInterface:
             "draw_char": self.primitives,
             "draw_string": self.primitives,
             "draw_at": self.primitives,
+            "blit": self.primitives,
+            "fill_row": self.primitives,
+            "fill_rect": self.primitives,
             # Complex shapes
             "draw_rectangle": self.shapes,
             "draw_matrix": self.shapes,
@@ -0,0 +1,97 @@
+from typing import Optional
+
+from core.color import ColorManager
+from core.encoder import FrameEncoder
+from core.frame_diff import FrontBuffer
+from core.metrics import PHASES, RenderMetrics
+from core.screen_buffer import ScreenBuffer
+from drawing.primitives import DrawingPrimitives
+
+HUD_WIDTH = 32
+HUD_HEIGHT = len(PHASES) + 4
+
+HUD_FG = "#E0E0E0"
+HUD_BG = "#202020"
+HUD_TITLE_FG = "#00FF00"
+
+
+class PerformanceHud:
+    """
+    Overlay showing the render metrics of the most recent frames.
+
+    The HUD is not a window: it draws into a buffer of its own, which is
+    diffed, encoded and written after the measured frame with a separate
+    encoder. Its drawing, cells and bytes therefore never show up in the
+    numbers it reports. The screen area it covers is left out of the app's
+    frames while it is shown.
+    """
+
+    def __init__(
+        self,
+        color_manager: ColorManager,
+        screen_width: int,
+        screen_height: int,
+        x: Optional[int] = None,
+        y: int = 0,
+    ):
+        # Screen sized, so spans index it like the screen buffer. Only what
+        # the HUD draws may reach the terminal, not the blank rest.
+        self.buffer = ScreenBuffer(screen_width, screen_height)
+        self.buffer.take_damage()
+        self.primitives = DrawingPrimitives(self.buffer, color_manager)
+        self.encoder = FrameEncoder(color_manager)
+        # Without an x the HUD sticks to the right edge, also after resizes
+        self._anchored_right = x is None
+        if x is None:
+            x = max(screen_width - HUD_WIDTH, 0)
+        self.rect = (x, y, HUD_WIDTH, HUD_HEIGHT)
+
+    def resize(self, screen_width: int, screen_height: int) -> None:
+        """Follow a new screen size, the next frame redraws the whole HUD"""
+        self.buffer.resize(screen_width, screen_height)
+        self.buffer.clear()
+        self.buffer.take_damage()
+        x, y, width, height = self.rect
+        if self._anchored_right:
+            x = max(screen_width - HUD_WIDTH, 0)
+        self.rect = (x, y, width, height)
+
+    def frame(self, front_buffer: FrontBuffer, metrics: RenderMetrics) -> bytes:
+        """Draw the HUD and encode the cells the terminal has to be sent"""
+        self.draw(metrics)
+        spans = front_buffer.diff(self.buffer)
+        return self.encoder.encode(self.buffer, spans)
+
+    def draw(self, metrics: RenderMetrics) -> None:
+        x, y, width, height = self.rect
+        draw_string = self.primitives.draw_string
+        self.primitives.fill_rect(x, y, width, height, " ", bg=HUD_BG)
+
+        draw_string(
+            x + 1,
+            y,
+            f"{'ms':<9}{'last':>7}{'p50':>7}{'p95':>7}",
+            fg=HUD_TITLE_FG,
+            bg=HUD_BG,
+        )
+        last = metrics.last
+        for line, phase in enumerate(PHASES + ("total",), start=1):
+            value = getattr(last, phase) if last else 0.0
+            draw_string(
+                x + 1,
+                y + line,
+                f"{phase:<9}{value * 1000:>7.2f}"
+                f"{metrics.percentile(phase, 50) * 1000:>7.2f}"
+                f"{metrics.percentile(phase, 95) * 1000:>7.2f}",
+                fg=HUD_FG,
+                bg=HUD_BG,
+            )
+
+        line = y + len(PHASES) + 2
+        if last:
+            counters = (
+                f"cells {last.cells}  bytes {last.bytes_written}",
+                f"draws {last.draw_calls}  frames {metrics.count}",
+            )
+            for offset, text in enumerate(counters):
+                draw_string(x + 1, line + offset, text, fg=HUD_FG, bg=HUD_BG)
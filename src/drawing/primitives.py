@@ -2,18 +2,86 @@ class DrawingPrimitives:
     def __init__(self, screen_buffer, color_manager):
         self.screen_buffer = screen_buffer
         self.color_manager = color_manager
-        self.width = screen_buffer.width
-        self.height = screen_buffer.height
+        # Drawing calls made, collected by RenderContext.take_draw_calls()
+        self.draw_calls = 0
 
-    def draw_char(self, x: int, y: int, char: str, fg: str = None, bg: str = None):
-        """Draw a character with optional foreground and background colors."""
+    # Read from the buffer, which may be resized in place
+
+    @property
+    def width(self) -> int:
+        return self.screen_buffer.width
+
+    @property
+    def height(self) -> int:
+        return self.screen_buffer.height
+
+    def draw_char(
+        self,
+        x: int,
+        y: int,
+        char: str,
+        fg: str = None,
+        bg: str = None,
+        attrs: int = 0,
+    ):
+        """
+        Draw a character with optional colors and attribute flags.
+
+        Colors may be hex strings, (r, g, b) tuples or color ids from
+        ColorManager.color().
+        """
+        self.draw_calls += 1
         if 0 <= x < self.width and 0 <= y < self.height:
-            formatted_char = char
-            if fg or bg:
-                color_codes = self.color_manager.format_color_codes(fg, bg)
-                formatted_char = f"{color_codes}{char}\033[0m"
+            self.screen_buffer.set_cell(
+                x,
+                y,
+                char,
+                self.color_manager.color(fg),
+                self.color_manager.color(bg),
+                attrs,
+            )
 
-            self.screen_buffer.set_char(x, y, formatted_char)
+    def fill_row(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        char: str = " ",
+        fg: str = None,
+        bg: str = None,
+        attrs: int = 0,
+    ):
+        """Draw the same character across a row span in one call."""
+        self.fill_rect(x, y, width, 1, char, fg, bg, attrs)
+
+    def fill_rect(
+        self,
+        x: int,
+        y: int,
+        width: int,
+        height: int,
+        char: str = " ",
+        fg: str = None,
+        bg: str = None,
+        attrs: int = 0,
+    ):
+        """
+        Fill a rectangle with one character, colors and attribute flags.
+
+        Colors are resolved once and the rectangle is written row by row with
+        slice assignments, clipped to the screen.
+        """
+        self.draw_calls += 1
+        self.screen_buffer.fill(
+            x,
+            y,
+            width,
+            height,
+            char,
+            self.color_manager.color(fg),
+            self.color_manager.color(bg),
+            attrs,
+        )
 
     def draw_string(
         self,
@@ -34,11 +102,16 @@ class DrawingPrimitives:
             text (str): Text to draw
             width (int): Width of the text field. If None, uses remaining screen width
             align (str): Alignment option - "left", "right", "center"
-            fg (str): Foreground color in hex format (e.g. "#FFFFFF")
-            bg (str): Background color in hex format (e.g. "#000000")
+            fg (str): Foreground color in hex format (e.g. "#FFFFFF") or color id
+            bg (str): Background color in hex format (e.g. "#000000") or color id
         """
+        self.draw_calls += 1
         text = str(text)  # Convert to string to handle numbers
 
+        # Resolve colors once instead of per character
+        fg = self.color_manager.color(fg)
+        bg = self.color_manager.color(bg)
+
         # If no width specified, use text length
         if width is None:
             width = len(text)
@@ -54,31 +127,96 @@ class DrawingPrimitives:
         # Ensure we don't start before the specified x position
         start_x = max(x, start_x)
 
-        # Draw the text
+        if not 0 <= y < self.height:
+            return
+
+        # Draw the text, straight into the buffer as the row is known visible
+        set_cell = self.screen_buffer.set_cell
+        screen_width = self.width
         current_x = x
         for i in range(width):
-            if current_x >= self.width:
+            if current_x >= screen_width:
                 break
 
             # Calculate if we're in the text region
             text_pos = i - (start_x - x)
 
-            if 0 <= text_pos < len(text):
-                # We're in the text region
-                self.draw_char(current_x, y, text[text_pos], fg, bg)
-            else:
-                # We're in the padding region
-                self.draw_char(current_x, y, " ", fg, bg)
+            if current_x >= 0:
+                if 0 <= text_pos < len(text):
+                    # We're in the text region
+                    set_cell(current_x, y, text[text_pos], fg, bg)
+                else:
+                    # We're in the padding region
+                    set_cell(current_x, y, " ", fg, bg)
 
             current_x += 1
 
     def draw_at(self, x: int, y: int, char: str, color: str = "#FFFFFF"):
         """Draw a character at a specific screen coordinate."""
+        self.draw_calls += 1
         if 0 <= x < self.width and 0 <= y < self.height:
             if len(str(char)) > 1:  # If we got a string instead of a single char
                 self.draw_string(x, y, char, color=color)
             else:
-                new_char = (
-                    self.color_manager.coloured_square(color) if char == " " else char
-                )
-                self.screen_buffer.set_char(x, y, new_char)
+                if char == " ":
+                    # A space is drawn as a square of the given color
+                    self.screen_buffer.set_cell(
+                        x, y, char, bg=self.color_manager.color(color)
+                    )
+                else:
+                    self.screen_buffer.set_char(x, y, char)
+
+    def blit(
+        self,
+        x: int,
+        y: int,
+        chars=" ",
+        fg=None,
+        bg=None,
+        attrs=0,
+        width: int = None,
+        height: int = None,
+    ):
+        """
+        Write a whole rectangle of cells in one call.
+
+        Args:
+            x, y: Top left corner of the rectangle
+            chars: 2D array of characters or code points, or a single character
+            fg: 2D array of color ids (or, with NumPy, of (r, g, b) triples),
+                or a single color for the whole rectangle
+            bg: Same as fg, for the background
+            attrs: 2D array of attribute flags or a single value
+            width, height: Size of the rectangle, taken from the first 2D
+                field when omitted
+
+        2D fields may be NumPy arrays, buffer-protocol objects with a 2D shape
+        or sequences of rows. The rectangle is clipped to the screen.
+        """
+        self.draw_calls += 1
+        fg = self._blit_color(fg)
+        bg = self._blit_color(bg)
+
+        if width is None or height is None:
+            for field in (chars, fg, bg, attrs):
+                if isinstance(field, (str, int)):
+                    continue
+                shape = getattr(field, "shape", ())
+                if len(shape) < 2:  # Sequence of rows
+                    shape = (len(field), len(field[0]))
+                height, width = shape[0], shape[1]
+                break
+            else:
+                raise ValueError("blit needs a width and height or a 2D field")
+
+        self.screen_buffer.blit(x, y, width, height, chars, fg, bg, attrs)
+
+    def _blit_color(self, color):
+        """Resolve a single blit color, leaving 2D arrays untouched."""
+        if (
+            color is None
+            or isinstance(color, (str, int))
+            or (isinstance(color, tuple) and isinstance(color[0], int))
+        ):
+            return self.color_manager.color(color)
+        return color
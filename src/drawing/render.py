@@ -1,4 +1,4 @@
-from typing import Optional, Dict
+from typing import Callable, Optional, Dict
 from dataclasses import dataclass
 
 from core.color import ColorManager
@@ -34,6 +34,7 @@ class RenderContext:
         if not self._initialized:
             self._global_resources: Optional[RenderResources] = None
             self._local_resources: Dict[str, RenderResources] = {}
+            self._render_requester: Optional[Callable[[], None]] = None
             self._initialized = True
 
     @classmethod
@@ -43,6 +44,15 @@ class RenderContext:
             cls._color_manager = ColorManager()
         return cls._color_manager
 
+    def set_render_requester(self, requester: Optional[Callable[[], None]]):
+        """Set the callback that schedules a frame, usually the app's scheduler"""
+        self._render_requester = requester
+
+    def request_render(self):
+        """Ask for a new frame, a no-op while no scheduler is attached"""
+        if self._render_requester is not None:
+            self._render_requester()
+
     def initialize(self, width: int, height: int):
         """Initialize the global rendering context"""
         screen_buffer = ScreenBuffer(width, height)
@@ -78,6 +88,18 @@ class RenderContext:
         self._local_resources[name] = resources
         return resources
 
+    def take_draw_calls(self) -> int:
+        """Count the drawing calls made in all contexts since the last call"""
+        contexts = list(self._local_resources.values())
+        if self._global_resources:
+            contexts.append(self._global_resources)
+        calls = 0
+        for resources in contexts:
+            for primitives in (resources.primitives, resources.draw.primitives):
+                calls += primitives.draw_calls
+                primitives.draw_calls = 0
+        return calls
+
     def get_resources(self, context_name: Optional[str] = None) -> RenderResources:
         """Get resources for either global or local context"""
         if context_name is None:
@@ -93,6 +115,9 @@ class RenderContext:
 class Renderable:
     """Mixin class for objects that need access to rendering resources"""
 
+    # Classes mixing this in declare its attributes in their own slots
+    __slots__ = ()
+
     def __init__(self, context_name: Optional[str] = None):
         self._context_name = context_name
 
@@ -102,4 +127,12 @@ class Renderable:
 
     @property
     def resources(self) -> RenderResources:
+        # Without a context of its own, draw into the parent's (e.g. a window)
+        parent = getattr(self, "_parent", None)
+        if self._context_name is None and parent is not None:
+            return parent.resources
         return self.context.get_resources(self._context_name)
+
+    def request_render(self):
+        """Ask for a new frame after changing what this object draws"""
+        self.context.request_render()
@@ -5,14 +5,16 @@ from ui.text import Text
 
 
 class BenchmarkUI(TerminalUI):
-    def _rainbow_pattern(self, t: float) -> str:
+    def _rainbow_pattern(self, t: float) -> int:
         import math
 
-        """Generate a rainbow color based on time and position."""
-        return "#{:02x}{:02x}{:02x}".format(
-            int(127 + 127 * (math.sin(t))),
-            int(127 + 127 * (math.sin(t + 2.094))),
-            int(127 + 127 * (math.sin(t + 4.188))),
+        """Generate a rainbow color id based on time and position."""
+        return self.color_manager.color(
+            (
+                int(127 + 127 * (math.sin(t))),
+                int(127 + 127 * (math.sin(t + 2.094))),
+                int(127 + 127 * (math.sin(t + 4.188))),
+            )
         )
 
     def stress_test(self, duration=10):
@@ -75,6 +77,9 @@ class BenchmarkUI(TerminalUI):
                 for x in range(5)
                 for y in range(5)
             ],
+            "blit_block": lambda: self.blit(
+                0, 0, ["XXXXX"] * 5, bg=[[0xFF0000, 0x000000] * 2 + [0xFF0000]] * 5
+            ),
             "stress_test": lambda: self.stress_test(duration=0.0001),
         }
 
@@ -1,5 +1,4 @@
 from main import TerminalUI
-import time
 
 
 def main():
@@ -93,9 +92,7 @@ def main():
             # Draw rank numbers (1-8) from bottom to top
             tui.draw.string(board_x - 2, board_y + 1 + (i * 3), str(8 - i))
 
-        while True:
-            tui.render()
-            time.sleep(0.1)
+        tui.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,367 @@
+"""
+Headless benchmark suite.
+
+Runs rendering scenarios against an in-memory terminal at fixed screen sizes
+and records, per frame, the time taken, the cells changed and the bytes
+emitted. Results can be saved as a JSON baseline and later runs compared
+against it, failing when a scenario got slower or emits more output than
+the threshold allows. From the repository root, with src on the path
+since the modules import each other both as src.* and top level:
+
+    PYTHONPATH=src:. python -m src.examples.headless_benchmark --save baseline.json
+    PYTHONPATH=src:. python -m src.examples.headless_benchmark --baseline baseline.json
+
+No tty is needed, so it can run on every change in CI.
+"""
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+from main import TerminalUI
+from src.core.virtual_terminal import MemoryTerminal
+from ui.data_table import DataTable
+from ui.list_view import ListView
+from ui.text import Text
+
+SIZES = [(80, 24), (160, 48), (240, 72), (400, 120)]
+
+# Frames rendered before measuring, to fill caches and the first screen
+WARMUP_FRAMES = 5
+FRAMES = 100
+
+# Relative growth of a metric that counts as a regression
+DEFAULT_THRESHOLD = 0.25
+
+# Fixed so output sizes do not depend on the environment
+COLOR_MODE = "truecolor"
+
+# Metrics compared against the baseline; counts are deterministic
+COMPARED = ("frame_ms_median", "cells", "bytes")
+
+# Time differences too small to tell apart from noise, in milliseconds
+MIN_TIME_DELTA_MS = 0.5
+
+# A scenario prepares the UI and returns the update made before each frame
+Scenario = Callable[[TerminalUI], Callable[[int], None]]
+
+
+def _toggle(frame: int) -> str:
+    return "XO"[frame % 2]
+
+
+def single_point(tui):
+    return lambda frame: tui.draw_at(0, 0, _toggle(frame))
+
+
+def diagonal_line(tui):
+    return lambda frame: [tui.draw_at(i, i, _toggle(frame)) for i in range(5)]
+
+
+def horizontal_line(tui):
+    return lambda frame: [tui.draw_at(i, 0, _toggle(frame)) for i in range(5)]
+
+
+def vertical_line(tui):
+    return lambda frame: [tui.draw_at(0, i, _toggle(frame)) for i in range(5)]
+
+
+def color_blocks(tui):
+    shades = ["FF", "CC", "99", "66", "33"]
+
+    def step(frame):
+        for i in range(5):
+            tui.draw_at(i, 0, " ", f"#{shades[(i + frame) % 5]}0000")
+
+    return step
+
+
+def checkerboard(tui):
+    def step(frame):
+        for x in range(5):
+            for y in range(5):
+                red = (x + y + frame) % 2 == 0
+                tui.draw_at(x, y, " ", "#FF0000" if red else "#000000")
+
+    return step
+
+
+def blit_block(tui):
+    colors = [0xFF0000, 0x000000]
+
+    def step(frame):
+        row = [colors[(i + frame) % 2] for i in range(5)]
+        tui.blit(0, 0, [_toggle(frame) * 5] * 5, bg=[row] * 5)
+
+    return step
+
+
+def plasma(tui):
+    """Every cell changes color every frame, like BenchmarkUI.stress_test"""
+    width, height = tui.screen_buffer.width, tui.screen_buffer.height
+    color = tui.color_manager.color
+    # Distance of each cell to the center, computed once
+    waves = [
+        [
+            math.sin(x * 0.1)
+            + math.cos(y * 0.1)
+            + math.sin(math.hypot(x - width / 2, y - height / 2) * 0.1)
+            for x in range(width)
+        ]
+        for y in range(height)
+    ]
+
+    def step(frame):
+        t = frame * 0.2
+        for y, row in enumerate(waves):
+            colors = [
+                color(
+                    (
+                        int(127 + 127 * math.sin(t + wave)),
+                        int(127 + 127 * math.sin(t + wave + 2.094)),
+                        int(127 + 127 * math.sin(t + wave + 4.188)),
+                    )
+                )
+                for wave in row
+            ]
+            tui.blit(0, y, " ", bg=[colors])
+
+    return step
+
+
+def window_composition(tui):
+    """Overlapping windows, one moving and one changing text every frame"""
+    width, height = tui.screen_buffer.width, tui.screen_buffer.height
+    window_width, window_height = width // 3, height // 3
+    labels = []
+    for i in range(6):
+        window = tui.create_window(
+            f"bench-{i}",
+            i * width // 8,
+            i * height // 8,
+            window_width,
+            window_height,
+        )
+        window.title = f"Window {i}"
+        labels.append(window.add(Text(f"content {i}", 2, 2)))
+    moving = tui.windows["bench-2"]
+
+    def step(frame):
+        moving.x = 2 * width // 8 + frame % 10
+        labels[4].content = f"frame {frame}"
+
+    return step
+
+
+def table_scroll(tui):
+    """DataTable over 100k rows, scrolling one row per frame"""
+    width, height = tui.screen_buffer.width, tui.screen_buffer.height
+    window = tui.create_window("bench-table", 0, 0, width, height)
+    rows = [
+        (i, f"item-{i * 7919 % 100000:05d}", i * 0.37 % 100) for i in range(100_000)
+    ]
+    table = window.add(
+        DataTable(["id", "name", "value"], rows, 1, 1, width - 2, height - 2)
+    )
+    table.sort(1)
+
+    def step(frame):
+        table.select(frame)
+
+    return step
+
+
+def list_scroll(tui):
+    """ListView over a million items, scrolling one row per frame"""
+    width, height = tui.screen_buffer.width, tui.screen_buffer.height
+    window = tui.create_window("bench-list", 0, 0, width, height)
+    view = window.add(
+        ListView(
+            x=1,
+            y=1,
+            width=width - 2,
+            height=height - 2,
+            length=1_000_000,
+            item=lambda index: f"result {index:>7} " + "." * (index % 40),
+        )
+    )
+
+    def step(frame):
+        view.scroll_by(1)
+
+    return step
+
+
+def text_heavy(tui):
+    """A screen full of labels, a quarter of them changing every frame"""
+    width, height = tui.screen_buffer.width, tui.screen_buffer.height
+    window = tui.create_window("bench-text", 0, 0, width, height)
+    columns = max((width - 2) // 20, 1)
+    labels = [
+        window.add(Text(f"label {row}:{column}", 1 + column * 20, 1 + row).width(19))
+        for row in range(height - 2)
+        for column in range(columns)
+    ]
+
+    def step(frame):
+        for i in range(frame % 4, len(labels), 4):
+            labels[i].content = f"value {frame * 31 + i:>8}"
+
+    return step
+
+
+def resize(tui):
+    """Split windows over a terminal that narrows and widens every frame"""
+    width, height = tui.screen_buffer.width, tui.screen_buffer.height
+    board, side = tui.create_horizontal_split(["bench-board", "bench-side"], [0.6, 0.4])
+    board.add(Text("board", 2, 2))
+    side.add(ListView([f"move {i}" for i in range(200)], 1, 1, 20, height - 2))
+
+    def step(frame):
+        tui.terminal.resize(width - frame % 2 * 10, height)
+        tui.resize()
+
+    return step
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "single_point": single_point,
+    "diagonal_line": diagonal_line,
+    "horizontal_line": horizontal_line,
+    "vertical_line": vertical_line,
+    "color_blocks": color_blocks,
+    "checkerboard": checkerboard,
+    "blit_block": blit_block,
+    "plasma": plasma,
+    "window_composition": window_composition,
+    "table_scroll": table_scroll,
+    "list_scroll": list_scroll,
+    "text_heavy": text_heavy,
+    "resize": resize,
+}
+
+
+def run_scenario(scenario: Scenario, width: int, height: int, frames: int) -> dict:
+    """Render a scenario headless and summarize its frames"""
+    # Only the UI's side is measured, the output is counted but not replayed
+    tui = TerminalUI(terminal=MemoryTerminal(width, height, emulate=False))
+    tui.color_manager.color_mode = COLOR_MODE
+    step = scenario(tui)
+
+    for frame in range(WARMUP_FRAMES):
+        step(frame)
+        tui.render()
+
+    times, cells, sizes = [], [], []
+    for frame in range(WARMUP_FRAMES, WARMUP_FRAMES + frames):
+        start = time.perf_counter()
+        step(frame)
+        tui.render()
+        times.append((time.perf_counter() - start) * 1000)
+        cells.append(tui.metrics.last.cells)
+        sizes.append(tui.metrics.last.bytes_written)
+
+    times.sort()
+    return {
+        "frames": frames,
+        "frame_ms_median": statistics.median(times),
+        "frame_ms_p95": times[min(math.ceil(0.95 * frames), frames) - 1],
+        "frame_ms_mean": statistics.fmean(times),
+        "cells": sum(cells),
+        "bytes": sum(sizes),
+    }
+
+
+def run_suite(names: list[str], sizes: list[tuple[int, int]], frames: int) -> dict:
+    results = {}
+    for name in names:
+        for width, height in sizes:
+            key = f"{name}@{width}x{height}"
+            results[key] = run_scenario(SCENARIOS[name], width, height, frames)
+            print(_format_result(key, results[key]))
+    return {
+        "python": platform.python_version(),
+        "color_mode": COLOR_MODE,
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Describe every metric that grew by more than the threshold"""
+    regressions = []
+    for key, base in baseline["results"].items():
+        current = results["results"].get(key)
+        if current is None:
+            continue
+        for metric in COMPARED:
+            old, new = base[metric], current[metric]
+            if new <= old * (1 + threshold):
+                continue
+            if metric.startswith("frame_ms") and new - old < MIN_TIME_DELTA_MS:
+                continue
+            change = f"+{(new - old) / old:.0%}" if old else "new"
+            regressions.append(f"{key} {metric}: {old:g} -> {new:g} ({change})")
+    return regressions
+
+
+def _format_result(key: str, result: dict) -> str:
+    return (
+        f"{key:<32} median {result['frame_ms_median']:8.3f} ms"
+        f"  p95 {result['frame_ms_p95']:8.3f} ms"
+        f"  cells {result['cells']:>9}  bytes {result['bytes']:>10}"
+    )
+
+
+def _parse_size(text: str) -> tuple[int, int]:
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="comma separated scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(f"{w}x{h}" for w, h in SIZES),
+        help="comma separated screen sizes, e.g. 80x24,400x120",
+    )
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    names = args.scenarios.split(",")
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    sizes = [_parse_size(size) for size in args.sizes.split(",")]
+
+    results = run_suite(names, sizes, args.frames)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
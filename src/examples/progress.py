@@ -25,7 +25,8 @@ def main():
         window.add(Text("Progress Bar Styles Demo", 2, 1).align("center"))
         window.add(Text("=" * len("Progress Bar Styles Demo"), 2, 2,).align("center"))
         window.add(Text("Press Ctrl+C to exit", 2, window.height - 2).align("center"))
-        while True:
+
+        def update():
             t = time.time() - start_time
 
             # Clear window
@@ -42,7 +43,7 @@ def main():
                 # For rainbow style, calculate dynamic color
                 if color is None:
                     hue = (t * 0.2 + i * 0.2) % 1.0
-                    color = tui.color_manager.hsv_to_hex(hue, 1.0, 1.0)
+                    color = tui.color_manager.hsv_color(hue, 1.0, 1.0)
 
                 # Draw label
                 window.draw.string(2, y_pos, f"{name}:")
@@ -58,9 +59,8 @@ def main():
                     bg_color=bg_color,
                 )
 
-
-            tui.render()
-            time.sleep(0.03)
+        # Let the scheduler redraw the bars once per frame
+        tui.run(on_frame=update)
 
 
 if __name__ == "__main__":
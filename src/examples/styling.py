@@ -1,5 +1,3 @@
-import time
-
 from main import TerminalUI
 from ui.container import Container
 from ui.text import Text
@@ -20,9 +18,7 @@ def main():
         window.draw.draw_rectangle(0, 0, 20, 20)
         window.add(container)
 
-        while True:
-            tui.render()
-            time.sleep(0.1)
+        tui.run()
 
 if __name__ == "__main__":
     main()
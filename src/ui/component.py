@@ -4,9 +4,12 @@ from functools import wraps
 from typing import Any, Callable, Optional, TypeVar
 
 from core.screen_buffer import ScreenBuffer
+from drawing.compositor import intersect
+from drawing.render import RenderContext
+from ui.layout import DEFAULT_ITEM, LayoutItem, Rect
 
 
-@dataclass
+@dataclass(slots=True)
 class Style:
     fg: Optional[str] = None
     bg: Optional[str] = None
@@ -24,19 +27,120 @@ class Style:
 
 
 class Component(ABC):
+    """
+    Node of the retained component tree.
+
+    Components keep what they drew in their window's buffer between frames.
+    Mutators mark a component dirty, which flags its ancestors as having a
+    dirty subtree, so rendering only visits the paths to what changed and
+    leaves clean subtrees and their last output alone.
+
+    The absolute position and effective style are cached per component and
+    dropped for the whole subtree when a component moves, changes its style
+    or gets a new parent.
+    """
+
+    __slots__ = (
+        "_dirty",
+        "_subtree_dirty",
+        "_style",
+        "_parent",
+        "_x",
+        "_y",
+        "_position",
+        "_effective_style",
+        "_render_origin",
+        "_layout_item",
+        "_measured",
+        "_layout_valid",
+        "_arranged",
+    )
+
+    # Components with children replace this with a list
+    children = ()
+
     def __init__(self, x: int = 0, y: int = 0):
+        self._dirty = True
+        self._subtree_dirty = False
         self._style = Style()
         self._parent = None
-        self.x = x
-        self.y = y
+        self._x = x
+        self._y = y
+        self._position: Optional[tuple[int, int]] = None
+        self._effective_style: Optional[Style] = None
+        # Absolute position while render_to() runs, see transform_coordinates
+        self._render_origin: Optional[tuple[int, int]] = None
+        # Placement options for the parent's layout, and the measure cache
+        self._layout_item: Optional[LayoutItem] = None
+        self._measured: Optional[dict[tuple[int, int], tuple[int, int]]] = None
+        self._layout_valid = False
+        # Rectangle last assigned by the parent's layout
+        self._arranged: Optional[Rect] = None
+
+    @property
+    def x(self) -> int:
+        """Relative x coordinate, or the absolute one while rendering"""
+        origin = self._render_origin
+        return self._x if origin is None else origin[0]
+
+    @x.setter
+    def x(self, x: int) -> None:
+        if x != self._x:
+            self._x = x
+            self._moved()
+
+    @property
+    def y(self) -> int:
+        """Relative y coordinate, or the absolute one while rendering"""
+        origin = self._render_origin
+        return self._y if origin is None else origin[1]
+
+    @y.setter
+    def y(self, y: int) -> None:
+        if y != self._y:
+            self._y = y
+            self._moved()
+
+    def _moved(self) -> None:
+        """Redraw the component at its new position"""
+        self._invalidate_position()
+        self.mark_dirty()
+
+    def _set_parent(self, parent: "Component") -> None:
+        """Attach the component to a parent, dropping inherited caches"""
+        self._parent = parent
+        self._invalidate_position()
+        self._invalidate_style()
+
+    def _invalidate_position(self) -> None:
+        """Drop the cached absolute positions of the subtree"""
+        self._position = None
+        for child in self.children:
+            child._invalidate_position()
+
+    def _invalidate_style(self) -> None:
+        """Drop the cached effective styles of the subtree"""
+        self._effective_style = None
+        for child in self.children:
+            child._invalidate_style()
 
     @property
     def absolute_position(self) -> tuple[int, int]:
         """Get absolute coordinates by combining with parent positions"""
-        if not self._parent:
-            return (self.x, self.y)
-        parent_x, parent_y = self._parent.absolute_position
-        return (parent_x + self.x, parent_y + self.y)
+        position = self._position
+        if position is None:
+            if not self._parent:
+                position = (self._x, self._y)
+            else:
+                parent_x, parent_y = self._parent.content_origin
+                position = (parent_x + self._x, parent_y + self._y)
+            self._position = position
+        return position
+
+    @property
+    def content_origin(self) -> tuple[int, int]:
+        """Get the coordinates children are positioned relative to"""
+        return self.absolute_position
 
     def get_absolute_coords(self, rel_x: int, rel_y: int) -> tuple[int, int]:
         """Convert component-relative coordinates to absolute screen coordinates"""
@@ -45,34 +149,203 @@ class Component(ABC):
 
     @property
     def effective_style(self) -> Style:
-        """Get the effective style including inherited styles."""
+        """Get the effective style including inherited styles (do not mutate)."""
         if not self._parent:
             return self._style
-        return self._parent.effective_style.merge(self._style)
+        style = self._effective_style
+        if style is None:
+            style = self._parent.effective_style.merge(self._style)
+            self._effective_style = style
+        return style
 
     def style(self, options: dict[str, Any]) -> "Component":
         """Apply styling options."""
         for key, value in options.items():
             if hasattr(self._style, key):
                 setattr(self._style, key, value)
+        self._style_changed()
         return self
 
     def align(self, alignment: str) -> "Component":
         self._style.align = alignment
+        self._style_changed()
         return self
 
     def fg(self, color: str) -> "Component":
         self._style.fg = color
+        self._style_changed()
         return self
 
     def bg(self, color: str) -> "Component":
         self._style.bg = color
+        self._style_changed()
         return self
 
     def width(self, width: int) -> "Component":
         self._style.width = width
+        self._style_changed()
+        return self
+
+    def _style_changed(self) -> None:
+        """Recompute inherited styles below and redraw"""
+        self._invalidate_style()
+        self.mark_dirty()
+
+    @property
+    def layout_item(self) -> LayoutItem:
+        """Placement options for the parent's layout"""
+        return self._layout_item or DEFAULT_ITEM
+
+    def flex(
+        self, grow: int = 0, shrink: int = 1, basis: Optional[int] = None
+    ) -> "Component":
+        """Set how a flex layout sizes the component along its main axis."""
+        item = self._layout_item or LayoutItem()
+        item.grow, item.shrink, item.basis = grow, shrink, basis
+        self._layout_item = item
+        self.invalidate_layout()
+        return self
+
+    def grid(
+        self,
+        row: Optional[int] = None,
+        column: Optional[int] = None,
+        row_span: int = 1,
+        column_span: int = 1,
+    ) -> "Component":
+        """Set the cell a grid layout places the component in."""
+        item = self._layout_item or LayoutItem()
+        item.row, item.column = row, column
+        item.row_span, item.column_span = row_span, column_span
+        self._layout_item = item
+        self.invalidate_layout()
         return self
 
+    def measure(self, max_width: int, max_height: int) -> tuple[int, int]:
+        """
+        Get the (width, height) the component would like within a space.
+
+        Results are cached per available space, since the measure and
+        arrange passes may ask with different limits, until
+        invalidate_layout() is called on the component or a descendant.
+        """
+        key = (max_width, max_height)
+        if self._measured is None:
+            self._measured = {}
+        size = self._measured.get(key)
+        if size is None:
+            size = self._measured[key] = self._measure(max_width, max_height)
+        return size
+
+    def _measure(self, max_width: int, max_height: int) -> tuple[int, int]:
+        """Measure the component, without caching"""
+        width = getattr(self, "_width", None) or self._style.width or 0
+        height = getattr(self, "_height", None) or 1
+        return (min(width, max_width), min(height, max_height))
+
+    def arrange(self, x: int, y: int, width: int, height: int) -> None:
+        """
+        Place the component relative to its parent and give it a size.
+
+        Called by the parent's layout while it renders, so moving only flags
+        the component dirty instead of requesting another frame.
+        """
+        if (x, y) != (self._x, self._y):
+            self._x, self._y = x, y
+            self._invalidate_position()
+            self._dirty = True
+        self._arranged = (x, y, width, height)
+        self.resize(width, height)
+        self.update_layout()
+
+    def resize(self, width: int, height: int) -> None:  # noqa: B027
+        """Take the size assigned by a layout, components keep theirs by default"""
+        pass
+
+    def update_layout(self) -> None:  # noqa: B027
+        """Lay out children again if needed, for components with a layout"""
+        pass
+
+    def _erase_rearranged(self, before: list[Optional[Rect]]) -> None:
+        """
+        Erase what children drew where the layout no longer puts them.
+
+        Children whose rectangle changed are drawn again, as are those
+        overlapping an erased area; the others keep their output.
+
+        Args:
+            before: Rectangles of the children before the layout ran
+        """
+        erased = [
+            old
+            for child, old in zip(self.children, before, strict=True)
+            if old is not None and child._arranged != old
+        ]
+        if not erased:
+            return
+        origin_x, origin_y = self.content_origin
+        bg = self.effective_style.bg
+        for x, y, width, height in erased:
+            self.resources.primitives.fill_rect(
+                origin_x + x, origin_y + y, width, height, " ", bg=bg
+            )
+        for child, old in zip(self.children, before, strict=True):
+            rect = child._arranged
+            if rect is None:
+                continue
+            if rect != old or any(intersect(rect, area) for area in erased):
+                child._dirty = True
+
+    def invalidate_layout(self) -> None:
+        """
+        Have the component measured and its branch laid out again.
+
+        Ancestors are measured again too, since their size may depend on
+        this one, but siblings keep their cached measurements.
+        """
+        node = self
+        while node is not None:
+            node._measured = None
+            node._layout_valid = False
+            node = node._parent
+        self.mark_dirty()
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the component has to be drawn again"""
+        return self._dirty
+
+    def mark_dirty(self) -> None:
+        """Have the component redrawn, with its subtree, on the next frame"""
+        self._dirty = True
+        parent = self._parent
+        while parent is not None and not parent._subtree_dirty:
+            parent._subtree_dirty = True
+            parent = parent._parent
+        RenderContext().request_render()
+
+    def render(self, target_buffer: ScreenBuffer, force: bool = False) -> None:
+        """
+        Render the component if anything in its subtree changed.
+
+        Dirty components are drawn in full, including all their children,
+        since their output may cover what the children drew. Components with
+        only dirty descendants let render_changed() visit those.
+
+        Args:
+            target_buffer: Buffer to render into
+            force: Draw the component even if it is clean
+        """
+        if force or self._dirty:
+            self.render_to(target_buffer)
+        elif self._subtree_dirty:
+            self.render_changed(target_buffer)
+        self._dirty = self._subtree_dirty = False
+
+    def render_changed(self, target_buffer: ScreenBuffer) -> None:  # noqa: B027
+        """Render the descendants that changed, for components with children"""
+        pass
+
     @abstractmethod
     def render_to(self, target_buffer: ScreenBuffer) -> None:
         pass
@@ -84,20 +357,15 @@ def transform_coordinates(render_method: Callable[..., T]) -> Callable[..., T]:
     """Decorator that transforms relative coordinates to absolute before rendering"""
     @wraps(render_method)
     def wrapper(self: Component, target_buffer: ScreenBuffer, *args, **kwargs):
-        # Store original coordinates
-        original_x, original_y = self.x, self.y
-
-        # Calculate and set absolute position
-        if self._parent:
-            parent_x, parent_y = self._parent.absolute_position
-            self.x += parent_x
-            self.y += parent_y
+        # Let x and y report the cached absolute position while rendering
+        previous_origin = self._render_origin
+        self._render_origin = self.absolute_position
 
         try:
             # Execute the render method with transformed coordinates
             return render_method(self, target_buffer, *args, **kwargs)
         finally:
             # Restore original relative coordinates
-            self.x, self.y = original_x, original_y
+            self._render_origin = previous_origin
 
     return wrapper
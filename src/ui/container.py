@@ -1,9 +1,18 @@
 from core.screen_buffer import ScreenBuffer
 from drawing.render import RenderResources, Renderable
 from ui.component import Component, transform_coordinates
+from ui.layout import Layout
 
 
 class Container(Component, Renderable):
+    __slots__ = (
+        "_context_name",
+        "_width",
+        "_height",
+        "children",
+        "_layout",
+    )
+
     def __init__(self, x: int = 0, y: int = 0, width: int = None, height: int = None):
         Component.__init__(self, x, y)
         # Don't initialize Renderable with a context_name - we'll get it from parent
@@ -12,16 +21,57 @@ class Container(Component, Renderable):
         self._width = width
         self._height = height
         self.children: list[Component] = []
+        self._layout: Layout = None
 
         if width is not None:
             super().width(width)
 
     def add(self, child: Component) -> Component:
         """Add a child element that will inherit styles"""
-        child._parent = self
+        child._set_parent(self)
         self.children.append(child)
+        self.invalidate_layout()
         return child
 
+    def layout(self, layout: Layout) -> "Container":
+        """Position children with a layout instead of their own coordinates"""
+        self._layout = layout
+        self.invalidate_layout()
+        return self
+
+    def _measure(self, max_width: int, max_height: int) -> tuple[int, int]:
+        if self._layout is None:
+            return super()._measure(max_width, max_height)
+        # Fixed dimensions win over what the children need
+        width, height = self._layout.measure(self.children, max_width, max_height)
+        return (
+            min(self._width or width, max_width),
+            min(self._height or height, max_height),
+        )
+
+    def resize(self, width: int, height: int) -> None:
+        if (width, height) != (self._width, self._height):
+            self._width, self._height = width, height
+            self._layout_valid = False
+            self._dirty = True
+
+    def update_layout(self) -> None:
+        """Arrange the children if the layout or anything in it changed"""
+        if self._layout_valid:
+            return
+        if self._layout is not None:
+            before = [child._arranged for child in self.children]
+            self._layout.arrange(
+                self.children, (0, 0, self._width or 0, self._height or 0)
+            )
+            # A dirty container fills its whole area anyway
+            if not self._dirty:
+                self._erase_rearranged(before)
+        else:
+            for child in self.children:
+                child.update_layout()
+        self._layout_valid = True
+
     @property
     def resources(self) -> RenderResources:
         """Get resources from parent's context"""
@@ -34,8 +84,9 @@ class Container(Component, Renderable):
         """Render container and its children"""
         style = self.effective_style
 
-        # If we have dimensions and a background color, fill the container
-        if self._width and self._height and style.bg:
+        # If we have dimensions and a background color, fill the container.
+        # Laid out containers own their area and always clear it.
+        if self._width and self._height and (style.bg or self._layout):
             self.resources.shapes.draw_rectangle(
                 self.x,
                 self.y,
@@ -46,6 +97,12 @@ class Container(Component, Renderable):
                 border=False,
             )
 
-        # Render all children
+        # The fill covered the children, render all of them again
+        for child in self.children:
+            child.render(target_buffer, force=True)
+
+    @transform_coordinates
+    def render_changed(self, target_buffer: ScreenBuffer) -> None:
+        """Render only the children that changed"""
         for child in self.children:
-            child.render_to(target_buffer)
+            child.render(target_buffer)
@@ -0,0 +1,265 @@
+from bisect import insort
+from typing import Any, Callable, Optional, Sequence
+
+from core.screen_buffer import ScreenBuffer
+from ui.component import transform_coordinates
+from ui.list_view import ListView
+
+# Rows looked at to size the columns of a large dataset
+WIDTH_SAMPLE = 1000
+
+# Lines above the rows: headers and a separator
+HEADER_LINES = 2
+
+
+class DataTable(ListView):
+    """
+    Table over a large list of rows, with sorting and filtering.
+
+    The base rows are never reordered. Sorting a column builds an index of
+    row ids ordered by that column once and keeps it; the table shows a view
+    of row ids, taken from the index of the sort column and narrowed by the
+    filters. Sorting the other way round reads the same view backwards, and
+    adding a filter only tests the rows still shown.
+
+    Appended rows are inserted into the existing indexes and the view by
+    binary search, so a live feed never rebuilds them. Column widths are
+    taken from a sample of the rows and widened as rows are appended.
+
+    Only the visible rows are formatted and drawn, see ListView.
+    """
+
+    __slots__ = (
+        "headers",
+        "_data",
+        "_indexes",
+        "_sort_column",
+        "_descending",
+        "_filters",
+        "_view",
+        "_fixed_widths",
+        "col_widths",
+        "_header_drawn",
+    )
+
+    def __init__(
+        self,
+        headers: Sequence[str],
+        rows: Optional[Sequence[Sequence[Any]]] = None,
+        x: int = 0,
+        y: int = 0,
+        width: int = 40,
+        height: int = 10,
+        col_widths: Optional[list[int]] = None,
+    ):
+        self.headers = list(headers)
+        self._data: list[Sequence[Any]] = list(rows or [])
+        for row in self._data:
+            self._check_row(row)
+        # Per column: (value, row id) pairs in ascending order, built on demand
+        self._indexes: dict[int, list[tuple[Any, int]]] = {}
+        self._sort_column: Optional[int] = None
+        self._descending = False
+        self._filters: dict[str, Callable[[Sequence[Any]], bool]] = {}
+        # Row ids shown, in ascending order of the sort column
+        self._view: list[int] = list(range(len(self._data)))
+        self._fixed_widths = col_widths is not None
+        self.col_widths = col_widths or self._sample_widths()
+        self._header_drawn: Optional[str] = None
+        ListView.__init__(
+            self,
+            x=x,
+            y=y,
+            width=width,
+            height=max(height - HEADER_LINES, 0),
+            length=len(self._view),
+            item=self._row_text,
+        )
+
+    @property
+    def rows(self) -> Sequence[Sequence[Any]]:
+        """The base rows, in the order they were added (do not mutate)"""
+        return self._data
+
+    @property
+    def view(self) -> Sequence[int]:
+        """Row ids shown, top to bottom"""
+        return self._view[::-1] if self._descending else self._view
+
+    def row_at(self, index: int) -> Sequence[Any]:
+        """Row shown at a position of the table"""
+        if self._descending:
+            index = len(self._view) - 1 - index
+        return self._data[self._view[index]]
+
+    def sort(self, column: Optional[int], descending: bool = False) -> None:
+        """Order the rows by a column, or by insertion order for None"""
+        if column == self._sort_column:
+            if descending != self._descending:
+                # Same order read backwards
+                self._descending = descending
+                self._view_changed()
+            return
+        self._sort_column = column
+        self._descending = descending
+        self._rebuild_view()
+
+    def add_filter(self, name: str, predicate: Callable[[Sequence[Any]], bool]):
+        """
+        Only show rows the predicate accepts, in addition to other filters.
+
+        Only the rows shown so far are tested, as a new filter can only
+        narrow the view. Replacing a filter of the same name starts over.
+        """
+        if name in self._filters:
+            self._filters[name] = predicate
+            self._rebuild_view()
+            return
+        self._filters[name] = predicate
+        data = self._data
+        self._view = [row_id for row_id in self._view if predicate(data[row_id])]
+        self._view_changed()
+
+    def remove_filter(self, name: str) -> None:
+        if self._filters.pop(name, None) is not None:
+            self._rebuild_view()
+
+    def clear_filters(self) -> None:
+        if self._filters:
+            self._filters.clear()
+            self._rebuild_view()
+
+    def append(self, row: Sequence[Any]) -> None:
+        """Add a row, updating the indexes and the view in place"""
+        self._check_row(row)
+        self._insert(row)
+        self._view_changed()
+
+    def extend(self, rows: Sequence[Sequence[Any]]) -> None:
+        rows = list(rows)
+        # Check all rows first, so a bad one leaves the table unchanged
+        for row in rows:
+            self._check_row(row)
+        for row in rows:
+            self._insert(row)
+        self._view_changed()
+
+    def _check_row(self, row: Sequence[Any]) -> None:
+        """Raise ValueError for a row without exactly one cell per header"""
+        if len(row) != len(self.headers):
+            raise ValueError(
+                f"Row has {len(row)} cells, expected {len(self.headers)}: {row!r}"
+            )
+
+    def _insert(self, row: Sequence[Any]) -> None:
+        row_id = len(self._data)
+        self._data.append(row)
+        for column, index in self._indexes.items():
+            insort(index, (row[column], row_id))
+
+        if self._accepts(row):
+            if self._sort_column is None:
+                self._view.append(row_id)
+            else:
+                # The view is ordered like the index, by (value, row id)
+                column, data = self._sort_column, self._data
+                insort(
+                    self._view,
+                    row_id,
+                    key=lambda other: (data[other][column], other),
+                )
+
+        if not self._fixed_widths:
+            widths = self.col_widths
+            for column, cell in enumerate(row):
+                widths[column] = max(widths[column], len(str(cell)))
+
+    def _accepts(self, row: Sequence[Any]) -> bool:
+        return all(predicate(row) for predicate in self._filters.values())
+
+    def _index(self, column: int) -> list[tuple[Any, int]]:
+        """Ascending (value, row id) index of a column, built once"""
+        index = self._indexes.get(column)
+        if index is None:
+            index = sorted(
+                (row[column], row_id) for row_id, row in enumerate(self._data)
+            )
+            self._indexes[column] = index
+        return index
+
+    def _rebuild_view(self) -> None:
+        """Take the view from the sort index again, applying all filters"""
+        data = self._data
+        if self._sort_column is None:
+            row_ids = range(len(data))
+        else:
+            row_ids = (row_id for _, row_id in self._index(self._sort_column))
+        if self._filters:
+            self._view = [row_id for row_id in row_ids if self._accepts(data[row_id])]
+        else:
+            self._view = list(row_ids)
+        self._view_changed()
+
+    def _view_changed(self) -> None:
+        self.set_source(len(self._view), self._row_text)
+
+    def _sample_widths(self) -> list[int]:
+        """Column widths fitting the headers and rows spread over the data"""
+        # Room for the sort indicator next to each header
+        widths = [len(str(header)) + 2 for header in self.headers]
+        step = max(len(self._data) // WIDTH_SAMPLE, 1)
+        for row in self._data[::step]:
+            for column, cell in enumerate(row):
+                widths[column] = max(widths[column], len(str(cell)))
+        return widths
+
+    def _row_text(self, index: int) -> str:
+        """A shown row as one line of padded cells"""
+        row = self.row_at(index)
+        return " ".join(
+            str(cell)[:width].ljust(width)
+            for cell, width in zip(row, self.col_widths, strict=True)
+        )
+
+    def _header_text(self) -> str:
+        cells = []
+        for column, (header, width) in enumerate(
+            zip(self.headers, self.col_widths, strict=True)
+        ):
+            if column == self._sort_column:
+                header = f"{header} {'▼' if self._descending else '▲'}"
+            cells.append(str(header)[:width].center(width))
+        return " ".join(cells)
+
+    def resize(self, width: int, height: int) -> None:
+        super().resize(width, max(height - HEADER_LINES, 0))
+
+    def _measure(self, max_width: int, max_height: int) -> tuple[int, int]:
+        return (
+            min(self._width, max_width),
+            min(self._height + HEADER_LINES, max_height),
+        )
+
+    def _forget_rows(self) -> None:
+        super()._forget_rows()
+        self._header_drawn = None
+
+    @transform_coordinates
+    def render_to(self, target_buffer: ScreenBuffer) -> None:
+        header = self._header_text()
+        if header != self._header_drawn:
+            self._header_drawn = header
+            style = self.effective_style
+            primitives = self.resources.primitives
+            primitives.draw_string(
+                self.x,
+                self.y,
+                header[: self._width],
+                width=self._width,
+                fg=style.fg,
+                bg=style.bg,
+            )
+            primitives.fill_row(
+                self.x, self.y + 1, self._width, "─", fg=style.fg, bg=style.bg
+            )
+        self._draw_lines(self.x, self.y + HEADER_LINES)
@@ -1,9 +1,25 @@
+from itertools import islice
+
 from drawing.render import Renderable
 from ui.component import Component, transform_coordinates
 from ui.selectable import Selectable
 
 
+# Pasted whitespace that becomes a plain space in a single-line field
+PASTE_SPACES = str.maketrans("\n\t", "  ")
+
+
 class Input(Component, Renderable, Selectable):
+    __slots__ = (
+        "_context_name",
+        "_focused",
+        "_selection_style",
+        "_width",
+        "_value",
+        "_cursor_pos",
+        "_keyboard",
+    )
+
     def __init__(self, x: int = 0, y: int = 0, width: int = 20):
         Component.__init__(self, x, y)
         Renderable.__init__(self)
@@ -25,8 +41,10 @@ class Input(Component, Renderable, Selectable):
         if focused:
             self._keyboard.on_text(self._handle_text)
             self._keyboard.on_key("backspace")(self._handle_backspace)
+            self._keyboard.on_paste(self._handle_paste)
         else:
             self._keyboard.text_handler = None
+            self._keyboard.paste_handler = None
             if "backspace" in self._keyboard.handlers:
                 del self._keyboard.handlers["backspace"]
 
@@ -40,6 +58,24 @@ class Input(Component, Renderable, Selectable):
                 + self._value[self._cursor_pos :]
             )
             self._cursor_pos += 1
+            self.mark_dirty()
+
+    def _handle_paste(self, event):
+        """Insert pasted text at the cursor in one go"""
+        room = self._width - len(self._value)
+        if room <= 0:
+            return
+        # Filtering stops as soon as the field is full
+        text = event.text.translate(PASTE_SPACES)
+        inserted = "".join(islice(filter(str.isprintable, text), room))
+        if inserted:
+            self._value = (
+                self._value[: self._cursor_pos]
+                + inserted
+                + self._value[self._cursor_pos :]
+            )
+            self._cursor_pos += len(inserted)
+            self.mark_dirty()
 
     def _handle_backspace(self, event):
         """Handle backspace key"""
@@ -49,6 +85,7 @@ class Input(Component, Renderable, Selectable):
                 self._value[: self._cursor_pos - 1] + self._value[self._cursor_pos :]
             )
             self._cursor_pos -= 1
+            self.mark_dirty()
 
     @transform_coordinates
     def render_to(self, target_buffer):
@@ -0,0 +1,264 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from ui.component import Component
+
+Rect = tuple[int, int, int, int]
+
+# A grid track is a fixed number of cells, "auto" (fits its content) or a
+# fraction of the remaining space such as "1fr"
+Track = Union[int, str]
+
+
+@dataclass(slots=True)
+class LayoutItem:
+    """How a component wants to be placed by its parent's layout"""
+
+    grow: int = 0
+    shrink: int = 1
+    basis: Optional[int] = None
+    row: Optional[int] = None
+    column: Optional[int] = None
+    row_span: int = 1
+    column_span: int = 1
+
+
+DEFAULT_ITEM = LayoutItem()
+
+
+def distribute(total: int, weights: list[float]) -> list[int]:
+    """
+    Split a number of cells by weight into integers that add up to total.
+
+    Cells left over by rounding down go to the largest remainders, so the
+    parts never drift apart by more than one cell.
+    """
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    exact = [total * weight / weight_sum for weight in weights]
+    parts = [int(share) for share in exact]
+    leftover = total - sum(parts)
+    by_remainder = sorted(
+        range(len(weights)), key=lambda i: exact[i] - parts[i], reverse=True
+    )
+    for i in by_remainder[:leftover]:
+        parts[i] += 1
+    return parts
+
+
+class Layout(ABC):
+    """
+    Positions the children of a container in two passes.
+
+    measure() reports the size the children need, arrange() assigns each
+    child its rectangle. Children's sizes come from Component.measure(),
+    which caches its result until the child's layout is invalidated, so
+    laying out a container again only measures the branch that changed.
+    """
+
+    @abstractmethod
+    def measure(
+        self, children: list["Component"], max_width: int, max_height: int
+    ) -> tuple[int, int]:
+        """Size the children need within the given bounds as (width, height)"""
+
+    @abstractmethod
+    def arrange(self, children: list["Component"], area: Rect) -> None:
+        """Place the children inside area, given as (x, y, width, height)"""
+
+
+class FlexLayout(Layout):
+    """
+    Places children in a row or column.
+
+    Each child starts at its basis (or measured size) along the main axis.
+    Space left over is shared by grow factor, missing space is taken back by
+    shrink factor weighted by basis. Children are stretched across the cross
+    axis unless align is "start".
+    """
+
+    def __init__(self, direction: str = "row", gap: int = 0, align: str = "stretch"):
+        if direction not in ("row", "column"):
+            raise ValueError(f"Unknown flex direction '{direction}'")
+        self.direction = direction
+        self.gap = gap
+        self.align = align
+
+    def measure(self, children, max_width, max_height):
+        row = self.direction == "row"
+        main = cross = 0
+        for child in children:
+            width, height = child.measure(max_width, max_height)
+            main += width if row else height
+            cross = max(cross, height if row else width)
+        main += self.gap * max(len(children) - 1, 0)
+        return (main, cross) if row else (cross, main)
+
+    def arrange(self, children, area):
+        if not children:
+            return
+        x, y, width, height = area
+        row = self.direction == "row"
+        main_size, cross_size = (width, height) if row else (height, width)
+
+        items = [child.layout_item for child in children]
+        measured = [child.measure(width, height) for child in children]
+        bases = [
+            item.basis if item.basis is not None else (size[0] if row else size[1])
+            for item, size in zip(items, measured, strict=True)
+        ]
+
+        free = main_size - sum(bases) - self.gap * (len(children) - 1)
+        sizes = bases
+        if free > 0 and any(item.grow for item in items):
+            extra = distribute(free, [item.grow for item in items])
+            sizes = [size + add for size, add in zip(bases, extra, strict=True)]
+        elif free < 0:
+            weights = [
+                item.shrink * basis for item, basis in zip(items, bases, strict=True)
+            ]
+            if sum(weights) > 0:
+                cut = distribute(-free, weights)
+                sizes = [
+                    max(size - take, 0) for size, take in zip(bases, cut, strict=True)
+                ]
+
+        offset = 0
+        for child, size, natural in zip(children, sizes, measured, strict=True):
+            cross = cross_size
+            if self.align == "start":
+                cross = min(natural[1] if row else natural[0], cross_size)
+            if row:
+                child.arrange(x + offset, y, size, cross)
+            else:
+                child.arrange(x, y + offset, cross, size)
+            offset += size + self.gap
+
+
+class GridLayout(Layout):
+    """
+    Places children into the cells of a grid of row and column tracks.
+
+    Tracks are fixed sizes, "auto" tracks as large as their largest
+    single-span item, or "<n>fr" shares of the space left by the others.
+    Children choose their cell with Component.grid(); the rest flow into
+    free cells row by row.
+    """
+
+    def __init__(self, columns: list[Track], rows: list[Track] = None, gap: int = 0):
+        self.columns = columns
+        self.rows = rows or ["auto"]
+        self.gap = gap
+
+    def measure(self, children, max_width, max_height):
+        cells = self._place(children)
+        rows = self.rows_for(cells)
+        bounds = (max_width, max_height)
+        widths = self._track_sizes(self.columns, cells, children, 0, bounds)
+        heights = self._track_sizes(rows, cells, children, 1, bounds)
+        return (
+            sum(widths) + self.gap * max(len(widths) - 1, 0),
+            sum(heights) + self.gap * max(len(heights) - 1, 0),
+        )
+
+    def arrange(self, children, area):
+        x, y, width, height = area
+        cells = self._place(children)
+        rows = self.rows_for(cells)
+        bounds = (width, height)
+        widths = self._track_sizes(self.columns, cells, children, 0, bounds, True)
+        heights = self._track_sizes(rows, cells, children, 1, bounds, True)
+
+        column_starts = self._starts(x, widths)
+        row_starts = self._starts(y, heights)
+        for child, (row, column, row_span, column_span) in zip(
+            children, cells, strict=True
+        ):
+            child.arrange(
+                column_starts[column],
+                row_starts[row],
+                self._span(widths, column, column_span),
+                self._span(heights, row, row_span),
+            )
+
+    def rows_for(self, cells) -> list[Track]:
+        """Row tracks, repeating the last one for rows the items flowed into"""
+        used = max((row + span for row, _, span, _ in cells), default=0)
+        rows = list(self.rows)
+        while len(rows) < used:
+            rows.append(rows[-1])
+        return rows
+
+    def _place(self, children) -> list[tuple[int, int, int, int]]:
+        """(row, column, row_span, column_span) of each child"""
+        columns = len(self.columns)
+        taken = set()
+        cells = []
+        cursor = 0
+        for child in children:
+            item = child.layout_item
+            column_span = min(item.column_span, columns)
+            if item.row is not None and item.column is not None:
+                row, column = item.row, item.column
+            else:
+                # Auto placement: next free cell, row by row
+                while True:
+                    row, column = divmod(cursor, columns)
+                    fits = column + column_span <= columns and all(
+                        (row + dr, column + dc) not in taken
+                        for dr in range(item.row_span)
+                        for dc in range(column_span)
+                    )
+                    if fits:
+                        break
+                    cursor += 1
+            for dr in range(item.row_span):
+                for dc in range(column_span):
+                    taken.add((row + dr, column + dc))
+            cells.append((row, column, item.row_span, column_span))
+        return cells
+
+    def _track_sizes(
+        self, tracks, cells, children, axis: int, bounds: tuple[int, int], fill=False
+    ) -> list[int]:
+        """
+        Resolve track sizes; fr tracks share the free space only if fill.
+
+        Items are measured within bounds, the (width, height) of the whole
+        grid, so the axis not being sized keeps its own limit.
+        """
+        available = bounds[axis]
+        sizes = [0] * len(tracks)
+        fractions = [0.0] * len(tracks)
+        for i, track in enumerate(tracks):
+            if isinstance(track, int):
+                sizes[i] = track
+            elif track.endswith("fr"):
+                fractions[i] = float(track[:-2] or 1)
+
+        # Auto tracks fit their single-span items
+        for child, cell in zip(children, cells, strict=True):
+            start, span = (cell[1], cell[3]) if axis == 0 else (cell[0], cell[2])
+            if span == 1 and tracks[start] == "auto":
+                size = child.measure(*bounds)[axis]
+                sizes[start] = max(sizes[start], size)
+
+        if fill and any(fractions):
+            free = available - sum(sizes) - self.gap * (len(tracks) - 1)
+            for i, share in enumerate(distribute(max(free, 0), fractions)):
+                if fractions[i]:
+                    sizes[i] = share
+        return sizes
+
+    def _starts(self, origin: int, sizes: list[int]) -> list[int]:
+        starts = []
+        for size in sizes:
+            starts.append(origin)
+            origin += size + self.gap
+        return starts
+
+    def _span(self, sizes: list[int], start: int, span: int) -> int:
+        return sum(sizes[start : start + span]) + self.gap * (span - 1)
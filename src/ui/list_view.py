@@ -0,0 +1,222 @@
+from typing import Any, Callable, Optional, Sequence
+
+from core.screen_buffer import ScreenBuffer
+from drawing.render import Renderable
+from ui.component import Component, transform_coordinates
+from ui.selectable import Selectable
+
+# Colors of the selected row when the style leaves them open
+SELECTED_FG = "#000000"
+SELECTED_BG = "#FFFFFF"
+
+
+class ListView(Component, Renderable, Selectable):
+    """
+    Scrolling list that only draws the rows in its viewport.
+
+    Items come from a sequence or from a length and a callback producing the
+    item at an index, so the list can be as long as a result set without
+    ever being materialized. Rendering asks for the visible items only.
+
+    The view keeps one row slot per line of its height, recycled as it
+    scrolls, holding what that line shows. A render compares each line with
+    its slot and redraws only the lines whose text or highlight changed, so
+    the cost of a frame depends on the height of the view, not the length
+    of the list.
+    """
+
+    __slots__ = (
+        "_context_name",
+        "_focused",
+        "_selection_style",
+        "_width",
+        "_height",
+        "_length",
+        "_item",
+        "_top",
+        "_selected",
+        "_rows",
+        "_keyboard",
+        "_navigation",
+        "on_select",
+    )
+
+    def __init__(
+        self,
+        items: Optional[Sequence[Any]] = None,
+        x: int = 0,
+        y: int = 0,
+        width: int = 20,
+        height: int = 10,
+        length: Optional[int] = None,
+        item: Optional[Callable[[int], Any]] = None,
+    ):
+        Component.__init__(self, x, y)
+        Renderable.__init__(self)
+        Selectable.__init__(self)
+        self._width = width
+        self._height = height
+        self._length = 0
+        self._item: Callable[[int], Any] = str
+        self._top = 0
+        self._selected = 0
+        # What each line of the viewport shows, None until it is drawn
+        self._rows: list[Optional[tuple[str, int]]] = [None] * height
+        self._keyboard = None  # Keyboard handler
+        self._navigation: dict[str, Callable] = {}
+        self.on_select: Optional[Callable[[int], None]] = None
+
+        if item is not None:
+            self.set_source(length or 0, item)
+        else:
+            self.set_items(items or [])
+
+    def set_items(self, items: Sequence[Any]) -> "ListView":
+        """Show the items of a sequence"""
+        return self.set_source(len(items), items.__getitem__)
+
+    def set_source(self, length: int, item: Callable[[int], Any]) -> "ListView":
+        """Show length items, produced on demand by item(index)"""
+        self._length = length
+        self._item = item
+        self._top = self._clamp_top(self._top)
+        self._selected = min(self._selected, max(length - 1, 0))
+        self.refresh()
+        return self
+
+    def refresh(self) -> None:
+        """Check the visible rows for changed items on the next frame"""
+        self.mark_dirty()
+
+    @property
+    def length(self) -> int:
+        return self._length
+
+    @property
+    def top(self) -> int:
+        """Index of the first visible item"""
+        return self._top
+
+    @property
+    def selected(self) -> int:
+        """Index of the selected item"""
+        return self._selected
+
+    def scroll_to(self, top: int) -> None:
+        """Make top the first visible item"""
+        top = self._clamp_top(top)
+        if top != self._top:
+            self._top = top
+            self.mark_dirty()
+
+    def scroll_by(self, rows: int) -> None:
+        self.scroll_to(self._top + rows)
+
+    def select(self, index: int) -> None:
+        """Select an item and scroll just enough to show it"""
+        if not self._length:
+            return
+        index = max(0, min(index, self._length - 1))
+        if index != self._selected:
+            self._selected = index
+            self.mark_dirty()
+            if self.on_select:
+                self.on_select(index)
+        if index < self._top:
+            self.scroll_to(index)
+        elif index >= self._top + self._height:
+            self.scroll_to(index - self._height + 1)
+
+    def _clamp_top(self, top: int) -> int:
+        return max(0, min(top, self._length - self._height))
+
+    def set_keyboard_handler(self, keyboard_handler):
+        """Set keyboard handler reference"""
+        self._keyboard = keyboard_handler
+
+    def _key_handlers(self) -> dict[str, Callable]:
+        page = max(self._height - 1, 1)
+        return {
+            "down": lambda event: self.select(self._selected + 1),
+            "up": lambda event: self.select(self._selected - 1),
+            "pagedown": lambda event: self.select(self._selected + page),
+            "pageup": lambda event: self.select(self._selected - page),
+            "home": lambda event: self.select(0),
+            "end": lambda event: self.select(self._length - 1),
+        }
+
+    def on_focus_changed(self, focused: bool):
+        """Register/unregister navigation keys when focus changes"""
+        if not self._keyboard:
+            return
+
+        if focused:
+            self._navigation = self._key_handlers()
+            self._keyboard.handlers.update(self._navigation)
+        else:
+            for key, handler in self._navigation.items():
+                if self._keyboard.handlers.get(key) is handler:
+                    del self._keyboard.handlers[key]
+
+    def resize(self, width: int, height: int) -> None:
+        if (width, height) != (self._width, self._height):
+            self._width, self._height = width, height
+            self._rows = [None] * height
+            self._top = self._clamp_top(self._top)
+            self._dirty = True
+
+    def _invalidate_position(self) -> None:
+        # Lines drawn at the old position say nothing about the new one
+        super()._invalidate_position()
+        self._forget_rows()
+
+    def _invalidate_style(self) -> None:
+        super()._invalidate_style()
+        self._forget_rows()
+
+    def _forget_rows(self) -> None:
+        """Have every visible line drawn again"""
+        self._rows = [None] * self._height
+
+    def render(self, target_buffer: ScreenBuffer, force: bool = False) -> None:
+        # Something was drawn over the list, its lines are gone
+        if force:
+            self._forget_rows()
+        super().render(target_buffer, force)
+
+    @transform_coordinates
+    def render_to(self, target_buffer: ScreenBuffer) -> None:
+        self._draw_lines(self.x, self.y)
+
+    def _draw_lines(self, x: int, y: int) -> None:
+        """Draw the lines of the viewport that differ from their slot"""
+        style = self.effective_style
+        draw_string = self.resources.primitives.draw_string
+        selected_fg = style.bg or SELECTED_FG
+        selected_bg = style.fg or SELECTED_BG
+        if self.focused:
+            selected_bg = self._selection_style.border_fg
+
+        rows = self._rows
+        end = min(self._height, self._length - self._top)
+        for line in range(self._height):
+            index = self._top + line
+            if line < end:
+                # Highlight: 0 plain, 1 selected, 2 selected while focused
+                highlight = (index == self._selected) * (1 + self.focused)
+                row = (str(self._item(index)), highlight)
+            else:
+                row = ("", 0)
+            if row == rows[line]:
+                continue
+            rows[line] = row
+
+            text, highlight = row
+            draw_string(
+                x,
+                y + line,
+                text[: self._width],
+                width=self._width,
+                fg=selected_fg if highlight else style.fg,
+                bg=selected_bg if highlight else style.bg,
+            )
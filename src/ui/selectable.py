@@ -9,7 +9,10 @@ class SelectionStyle:
 
 
 class Selectable(ABC):
-    """Component that can receive focus"""
+    """Component that can receive focus, mixed into Component subclasses"""
+
+    # Classes mixing this in declare its attributes in their own slots
+    __slots__ = ()
 
     def __init__(self):
         self._focused = False
@@ -23,6 +26,8 @@ class Selectable(ABC):
     def focused(self, value: bool):
         if self._focused != value:
             self._focused = value
+            # Focus changes how selectable components are drawn
+            self.mark_dirty()
             self.on_focus_changed(value)
 
     def on_focus_changed(self, focused: bool):  # noqa: B027
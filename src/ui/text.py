@@ -4,10 +4,45 @@ from ui.component import Component, transform_coordinates
 
 
 class Text(Component, Renderable):
+    __slots__ = (
+        "_context_name",
+        "_content",
+        "_arranged_width",
+    )
+
     def __init__(self, content: str, x: int = 0, y: int = 0):
         Component.__init__(self, x, y)
         Renderable.__init__(self)
-        self.content = str(content)
+        self._content = str(content)
+        # Width assigned by the parent's layout, if any
+        self._arranged_width = None
+
+    @property
+    def content(self) -> str:
+        return self._content
+
+    @content.setter
+    def content(self, content: str) -> None:
+        content = str(content)
+        if content != self._content:
+            self._content = content
+            # Layouts only need to run again if the text changed size
+            measured = self._measured
+            if measured and any(
+                self._measure(*space) != size for space, size in measured.items()
+            ):
+                self.invalidate_layout()
+            else:
+                self.mark_dirty()
+
+    def _measure(self, max_width: int, max_height: int) -> tuple[int, int]:
+        width = self._style.width or len(self._content)
+        return (min(width, max_width), min(1, max_height))
+
+    def resize(self, width: int, height: int) -> None:
+        if width != self._arranged_width:
+            self._arranged_width = width
+            self._dirty = True
 
     def handle_text_input(self, text: str) -> bool:
         """Handle text input when focused"""
@@ -23,11 +58,12 @@ class Text(Component, Renderable):
     @transform_coordinates
     def render_to(self, target_buffer: ScreenBuffer) -> None:
         style = self.effective_style
+        width = self._arranged_width
         self.resources.primitives.draw_string(
             self.x,
             self.y,
             self.content,
-            width=style.width,
+            width=style.width if width is None else width,
             align=style.align,
             fg=style.fg,
             bg=style.bg,
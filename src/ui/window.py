@@ -1,19 +1,52 @@
+from typing import Optional
+
 from drawing.render import Renderable
 from src.core.screen_buffer import ScreenBuffer
 from src.ui.component import Component, transform_coordinates
+from ui.layout import Layout
 from ui.selectable import Selectable
 
 
 class Window(Component, Renderable, Selectable):
+    __slots__ = (
+        "_context_name",
+        "_focused",
+        "_selection_style",
+        "name",
+        "_height",
+        "_width",
+        "_title",
+        "children",
+        "_layout",
+        "transparent",
+        "_composited_bg",
+        "_composited_at",
+        "_chrome_dirty",
+        "_resources",
+        "buffer",
+        "primitives",
+        "shapes",
+        "draw",
+    )
+
     def __init__(self, name, x: int, y: int, width: int, height: int, title: str = ""):
         Component.__init__(self, x, y)
         Renderable.__init__(self, context_name=name)
         Selectable.__init__(self)
 
+        self.name = name
         self._height = height
         self._width = width
-        self.title = title
+        self._title = title
         self.children: list[Component] = []
+        self._layout: Layout = None
+        # Transparent windows let blank cells show what is below them
+        self.transparent = False
+        # Background and position the local buffer was last composited with
+        self._composited_bg = None
+        self._composited_at = None
+        # Border and title need drawing again
+        self._chrome_dirty = True
 
         # Initialize window's local rendering context
         self._resources = self.context.create_local_context(name, width, height)
@@ -34,18 +67,129 @@ class Window(Component, Renderable, Selectable):
             return getattr(self.shapes, name)
         raise AttributeError(f"'Window' has no attribute '{name}'")
 
+    @property
+    def content_origin(self) -> tuple[int, int]:
+        """Children draw into the window's own buffer, relative to its corner"""
+        return (0, 0)
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, title: str) -> None:
+        if title != self._title:
+            self._title = title
+            self._chrome_dirty = True
+            self.mark_dirty()
+
+    @property
+    def rect(self) -> tuple[int, int, int, int]:
+        """Screen area covered by the window as (x, y, width, height)"""
+        return (self.x, self.y, self._width, self._height)
+
+    def _moved(self) -> None:
+        # Children draw relative to the window's own buffer, which stays
+        # valid; the compositor copies it to the new place on the next frame
+        self._position = None
+        self.request_render()
+
+    def on_focus_changed(self, focused: bool):
+        # The border shows the focus
+        self._chrome_dirty = True
+
+    def _invalidate_style(self) -> None:
+        super()._invalidate_style()
+        self._chrome_dirty = True
+
     def add(self, child: Component) -> Component:
         """Add a child element that will inherit styles"""
-        child._parent = self
-        print(child._parent)
+        child._set_parent(self)
         self.children.append(child)
+        self.invalidate_layout()
         return child
 
+    def layout(self, layout: Layout) -> "Window":
+        """Position children inside the border with a layout"""
+        self._layout = layout
+        self.invalidate_layout()
+        return self
+
+    def resize(self, width: int, height: int) -> None:
+        """
+        Change the window size, keeping its children.
+
+        The local buffer is resized in place and drawn again in full, since
+        the border moved; the compositor recomposites what the window covers.
+        """
+        if (width, height) == (self._width, self._height):
+            return
+        self._width, self._height = width, height
+        self.buffer.resize(width, height)
+        self.buffer.clear()
+        self._chrome_dirty = True
+        self.invalidate_layout()
+
+    def update_layout(self) -> None:
+        """Arrange the children if the layout or anything in it changed"""
+        if self._layout_valid:
+            return
+        if self._layout is not None:
+            before = [child._arranged for child in self.children]
+            self._layout.arrange(
+                self.children, (1, 1, self._width - 2, self._height - 2)
+            )
+            # Clear only where children moved away from
+            self._erase_rearranged(before)
+        else:
+            for child in self.children:
+                child.update_layout()
+        self._layout_valid = True
+
     @transform_coordinates
     def render_to(self, target_buffer: ScreenBuffer):
         """Render window contents to the main screen buffer"""
+        self.paint()
+
+        # Composite everything again if the window moved
+        if (self.x, self.y) != self._composited_at:
+            self.invalidate()
+            self._composited_at = (self.x, self.y)
+
+        # Copy only the damaged regions of the local buffer to the main buffer
+        self.composite(target_buffer, self.damaged_regions())
+
+    def paint(self) -> None:
+        """
+        Draw what changed into the window's local buffer.
+
+        A dirty window draws all children, a window with dirty descendants
+        only those; a clean window keeps its buffer as it is. The border and
+        title are drawn again only after the size, title, style or focus
+        changed, or when a child drew over them.
+        """
+        if not self._dirty and not self._subtree_dirty:
+            return
+        self.update_layout()
+
         style = self.effective_style
 
+        # Blank cells take the window background, so a new one repaints all
+        bg = self.primitives.color_manager.color(style.bg)
+        if bg != self._composited_bg:
+            self.invalidate()
+            self._composited_bg = bg
+
+        # Render children, all of them if the window itself changed
+        force = self._dirty
+        for child in self.children:
+            child.render(self.buffer, force=force)
+        self._dirty = self._subtree_dirty = False
+
+        if not self._chrome_dirty and not self._chrome_overdrawn():
+            return
+        self._chrome_dirty = False
+
         # Draw border with appropriate color based on focus state
         border_fg = self._selection_style.border_fg if self.focused else style.fg
         border_bg = self._selection_style.border_bg if self.focused else style.bg
@@ -65,19 +209,60 @@ class Window(Component, Renderable, Selectable):
                 bg=border_bg,
             )
 
-        # Copy local buffer contents to main buffer
-        for y in range(self._height):
-            for x in range(self._width):
-                char = self.buffer.get_char(x, y)
-                target_x, target_y = self.x + x, self.y + y
+    def _chrome_overdrawn(self) -> bool:
+        """Whether the buffer changed on the border, e.g. under a wide child"""
+        last = self._height - 1
+        for row, (x0, x1) in self.buffer.damage.items():
+            if row == 0 or row == last or x0 == 0 or x1 >= self._width:
+                return True
+        return False
 
-                if char and char.strip():  # Only copy non-empty and non-space chars
-                    # Copy window buffer contents
-                    target_buffer.set_char(target_x, target_y, char)
-                elif style.bg is not None:
-                    # Fill entire window area with background color
-                    self.primitives.draw_char(target_x, target_y, " ", bg=style.bg)
+    def damaged_regions(self) -> list[tuple[int, int, int, int]]:
+        """Take the damage of the local buffer as screen rectangles"""
+        return [
+            (self.x + x, self.y + y, width, height)
+            for x, y, width, height in self.buffer.take_damage()
+        ]
 
-        # Render all children
-        for child in self.children:
-            child.render_to(target_buffer)
+    def invalidate(self, region: Optional[tuple[int, int, int, int]] = None) -> None:
+        """
+        Composite the window again on the next render.
+
+        Args:
+            region: (x, y, width, height) screen area to composite, by
+                default the whole window
+        """
+        if region is None:
+            self.buffer.mark_damaged(0, 0, self._width, self._height)
+        else:
+            x, y, width, height = region
+            self.buffer.mark_damaged(x - self.x, y - self.y, width, height)
+
+    def composite(self, target_buffer: ScreenBuffer, regions) -> None:
+        """
+        Copy regions of the local buffer to the target buffer.
+
+        Args:
+            target_buffer: Buffer to composite into, usually the screen
+            regions: (x, y, width, height) rectangles in target coordinates
+
+        Blank cells take the window background. Transparent windows skip
+        blank cells instead, so whatever is below them stays visible.
+        """
+        for x, y, width, height in regions:
+            # Clip the region against the window and the target buffer
+            x0 = max(x, self.x, 0)
+            y0 = max(y, self.y, 0)
+            x1 = min(x + width, self.x + self._width, target_buffer.width)
+            y1 = min(y + height, self.y + self._height, target_buffer.height)
+            target_buffer.copy_from(
+                self.buffer,
+                x0 - self.x,
+                y0 - self.y,
+                x0,
+                y0,
+                x1 - x0,
+                y1 - y0,
+                blank_bg=self._composited_bg,
+                transparent=self.transparent,
+            )
@@ -0,0 +1,34 @@
+import pytest
+
+from ui.data_table import DataTable
+
+
+def test_rows_must_have_one_cell_per_header():
+    with pytest.raises(ValueError):
+        DataTable(["a", "b"], [[1, 2, 3]])
+
+    table = DataTable(["a", "b"], [[1, 2]])
+    with pytest.raises(ValueError):
+        table.append([1, 2, 3])
+    with pytest.raises(ValueError):
+        table.append([1])
+    assert table.length == 1
+
+
+def test_extend_checks_all_rows_before_adding_any():
+    table = DataTable(["a", "b"], [[1, 2]])
+    with pytest.raises(ValueError):
+        table.extend([[3, 4], [5, 6, 7]])
+    assert table.rows == [[1, 2]]
+    assert table.length == 1
+
+
+def test_sort_and_filter_keep_appended_rows_in_order():
+    table = DataTable(["name", "size"], [["b", 2], ["a", 3], ["c", 1]])
+    table.sort(1)
+    table.append(["d", 0])
+    assert [table.row_at(i)[0] for i in range(table.length)] == ["d", "c", "b", "a"]
+
+    table.add_filter("big", lambda row: row[1] >= 2)
+    table.append(["e", 5])
+    assert [table.row_at(i)[0] for i in range(table.length)] == ["b", "a", "e"]
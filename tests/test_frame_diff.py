@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from core import frame_diff
+from core.color import ColorManager
+from core.encoder import FrameEncoder
+from core.frame_diff import FrontBuffer
+from core.screen_buffer import ATTR_BOLD, ATTR_UNDERLINE, DEFAULT_COLOR, ScreenBuffer
+from core.virtual_terminal import VirtualScreen
+
+WIDTH, HEIGHT = 40, 12
+COLORS = [DEFAULT_COLOR, 0xFF0000, 0x00FF00, 0x123456]
+
+
+@pytest.fixture(params=["numpy", "array"])
+def comparison(request, monkeypatch):
+    """Run each test with the vectorized and the plain comparison"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(frame_diff, "np", None)
+    return request.param
+
+
+def encoder():
+    color_manager = ColorManager()
+    color_manager.color_mode = "truecolor"
+    return FrameEncoder(color_manager)
+
+
+def cells(buffer):
+    return [
+        buffer.get_cell(x, y) for y in range(buffer.height) for x in range(buffer.width)
+    ]
+
+
+def draw_randomly(buffer, rng):
+    for _ in range(rng.randint(0, 30)):
+        buffer.set_cell(
+            rng.randrange(WIDTH),
+            rng.randrange(HEIGHT),
+            rng.choice("ab─é "),
+            rng.choice(COLORS),
+            rng.choice(COLORS),
+            rng.choice([0, ATTR_BOLD, ATTR_UNDERLINE]),
+        )
+    if rng.random() < 0.3:
+        buffer.fill(
+            rng.randrange(WIDTH),
+            rng.randrange(HEIGHT),
+            rng.randint(1, 15),
+            rng.randint(1, 5),
+            "x",
+            rng.choice(COLORS),
+            rng.choice(COLORS),
+            0,
+        )
+
+
+def test_diff_keeps_the_terminal_equal_to_the_back_buffer(comparison):
+    rng = random.Random(1)
+    back = ScreenBuffer(WIDTH, HEIGHT)
+    front = FrontBuffer(WIDTH, HEIGHT)
+    screen = VirtualScreen(WIDTH, HEIGHT)
+    frames = encoder()
+
+    for _ in range(50):
+        draw_randomly(back, rng)
+        screen.feed(frames.encode(back, front.diff(back)))
+        assert cells(screen.buffer) == cells(back)
+        assert cells(front.buffer) == cells(back)
+
+
+def test_unchanged_damage_sends_nothing(comparison):
+    back = ScreenBuffer(WIDTH, HEIGHT)
+    front = FrontBuffer(WIDTH, HEIGHT)
+    back.set_cell(3, 2, "a")
+    assert front.diff(back) == [(2, 3, 4)]
+
+    # Writing the same cell again is damage, but not a change
+    back.mark_damaged(0, 0, WIDTH, HEIGHT)
+    assert front.diff(back) == []
+
+
+def test_nearby_changes_are_merged_into_one_span(comparison):
+    back = ScreenBuffer(WIDTH, HEIGHT)
+    front = FrontBuffer(WIDTH, HEIGHT)
+    back.set_cell(1, 0, "a")
+    back.set_cell(1 + frame_diff.MERGE_GAP, 0, "b")
+    back.set_cell(20, 0, "c")
+    assert front.diff(back) == [(0, 1, 2 + frame_diff.MERGE_GAP), (0, 20, 21)]
+
+
+def test_excluded_area_is_left_alone(comparison):
+    back = ScreenBuffer(WIDTH, HEIGHT)
+    front = FrontBuffer(WIDTH, HEIGHT)
+    back.fill(0, 0, WIDTH, 1, "x")
+    assert front.diff(back, exclude=(10, 0, 5, 1)) == [(0, 0, 10), (0, 15, WIDTH)]
+    assert front.buffer.get_char(12, 0) == " "
+
+
+def test_invalidate_and_resize_send_every_damaged_cell(comparison):
+    back = ScreenBuffer(WIDTH, HEIGHT)
+    front = FrontBuffer(WIDTH, HEIGHT)
+    front.diff(back)
+
+    front.invalidate()
+    back.mark_damaged(0, 0, WIDTH, HEIGHT)
+    assert front.diff(back) == [(y, 0, WIDTH) for y in range(HEIGHT)]
+
+    back.resize(20, 5)
+    front.resize(20, 5)
+    back.mark_damaged(0, 0, 20, 5)
+    assert front.diff(back) == [(y, 0, 20) for y in range(5)]
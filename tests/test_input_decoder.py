@@ -0,0 +1,59 @@
+from core.input_decoder import InputDecoder, KeyEvent
+
+
+def feed_in_chunks(data: bytes, size: int) -> list[KeyEvent]:
+    decoder = InputDecoder()
+    events = []
+    for start in range(0, len(data), size):
+        events += decoder.feed(data[start : start + size])
+    assert not decoder.pending
+    return events
+
+
+def test_sequences_split_across_reads_decode_the_same():
+    data = "a\x1b[A\x1b[1;5C\x1bOPé\x1b[3~─\x1b[Z".encode()
+    expected = InputDecoder().feed(data)
+    assert [event.key for event in expected] == [
+        "text", "up", "right", "f1", "text", "delete", "text", "tab",
+    ]
+    assert expected[2].ctrl and expected[7].shift
+    assert expected[4].char == "é" and expected[6].char == "─"
+    for size in range(1, 6):
+        assert feed_in_chunks(data, size) == expected
+
+
+def test_lone_escape_waits_for_flush():
+    decoder = InputDecoder()
+    assert decoder.feed(b"\x1b") == []
+    assert decoder.pending
+    assert decoder.flush() == [KeyEvent(key="esc")]
+    assert not decoder.pending
+
+
+def test_alt_and_control_keys():
+    events = InputDecoder().feed(b"\x1bx\x01\r\x7f")
+    assert events == [
+        KeyEvent(key="text", char="x", alt=True),
+        KeyEvent(key="A", ctrl=True),
+        KeyEvent(key="enter"),
+        KeyEvent(key="backspace"),
+    ]
+
+
+def test_bracketed_paste_is_one_event():
+    data = b"x\x1b[200~line 1\r\nline 2\x1b[A\x1b[201~y"
+    expected = [
+        KeyEvent(key="text", char="x"),
+        KeyEvent(key="paste", text="line 1\nline 2\x1b[A"),
+        KeyEvent(key="text", char="y"),
+    ]
+    assert InputDecoder().feed(data) == expected
+    # The end marker may be split between reads
+    for size in range(1, 8):
+        assert feed_in_chunks(data, size) == expected
+
+
+def test_paste_cut_off_by_flush_keeps_its_text():
+    decoder = InputDecoder()
+    assert decoder.feed(b"\x1b[200~abc\x1b[20") == []
+    assert decoder.flush() == [KeyEvent(key="paste", text="abc\x1b[20")]
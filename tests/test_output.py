@@ -0,0 +1,103 @@
+import io
+import os
+import sys
+
+import pytest
+
+from core.output import OutputWriter, StreamWriter
+from core.term import TerminalController
+
+# More than any pipe buffer takes at once
+LARGE = 1 << 20
+
+
+@pytest.fixture
+def pipe():
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.set_blocking(write_fd, False)
+    yield read_fd, write_fd
+    os.close(read_fd)
+    os.close(write_fd)
+
+
+def read_available(fd: int) -> bytes:
+    chunks = []
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except BlockingIOError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def test_partial_write_stays_pending(pipe):
+    read_fd, write_fd = pipe
+    writer = OutputWriter(write_fd)
+    data = bytes(range(256)) * (LARGE // 256)
+
+    assert writer.write(data) >= 1
+    assert 0 < writer.pending < len(data)
+    assert writer.bytes_written + writer.pending == len(data)
+
+    # Nothing is taken while the pipe is full
+    assert writer.flush() == 0
+
+    received = read_available(read_fd)
+    while writer.pending:
+        writer.flush()
+        received += read_available(read_fd)
+    assert received == data
+    assert writer.bytes_written == len(data)
+
+
+def test_new_output_goes_after_pending_output(pipe):
+    read_fd, write_fd = pipe
+    writer = OutputWriter(write_fd)
+    writer.write(b"a" * LARGE)
+    pending = writer.pending
+    writer.write(b"tail")
+    assert writer.pending == pending + 4
+
+    received = b""
+    while writer.pending:
+        received += read_available(read_fd)
+        writer.flush()
+    received += read_available(read_fd)
+    assert received == b"a" * LARGE + b"tail"
+
+
+def test_stream_writer_is_never_pending():
+    stream = io.StringIO()
+    writer = StreamWriter(stream)
+    assert writer.write("─x".encode()) == 1
+    assert stream.getvalue() == "─x"
+    assert writer.pending == 0
+    assert writer.bytes_written == 4
+
+
+def test_controller_writes_through_stdout_without_a_descriptor(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", stream)
+    terminal = TerminalController(synchronized_output=False)
+    assert isinstance(terminal.output, StreamWriter)
+    terminal.write(b"hello")
+    assert stream.getvalue() == "hello"
+    assert terminal.ready()
+    assert terminal.pending_fd() is None
+
+
+def test_controller_reports_pending_output_until_sent(pipe, monkeypatch):
+    read_fd, write_fd = pipe
+    monkeypatch.setattr(sys, "stdout", os.fdopen(write_fd, "w", closefd=False))
+    terminal = TerminalController(synchronized_output=False)
+    terminal.write(b"x" * LARGE)
+    assert terminal.pending_fd() == write_fd
+    assert not terminal.ready()
+
+    while not terminal.ready():
+        read_available(read_fd)
+    assert terminal.pending_fd() is None
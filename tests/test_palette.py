@@ -0,0 +1,41 @@
+import random
+
+from core.palette import (
+    color_distance,
+    nearest_16,
+    nearest_256,
+    palette_color,
+    quantization_table,
+)
+
+
+def rgb(color: int) -> tuple[int, int, int]:
+    return color >> 16, (color >> 8) & 0xFF, color & 0xFF
+
+
+def distance_to(index: int, r: int, g: int, b: int) -> int:
+    return color_distance(r, g, b, *rgb(palette_color(index)))
+
+
+def test_nearest_256_matches_a_brute_force_search():
+    rng = random.Random(4)
+    for _ in range(2000):
+        r, g, b = rng.randrange(256), rng.randrange(256), rng.randrange(256)
+        best = min(distance_to(index, r, g, b) for index in range(16, 256))
+        assert distance_to(nearest_256(r, g, b), r, g, b) == best
+
+
+def test_tables_hold_the_nearest_color_of_each_bin():
+    for mode, nearest in (("256", nearest_256), ("basic", nearest_16)):
+        table = quantization_table(mode)
+        half = 1 << (table.shift - 1)
+        rng = random.Random(5)
+        for _ in range(500):
+            bins = [rng.randrange(1 << table.bits) for _ in range(3)]
+            r, g, b = ((i << table.shift) + half for i in bins)
+            assert table.lookup(r << 16 | g << 8 | b) == nearest(r, g, b)
+            # Any color of the bin maps to the same entry
+            r, g, b = ((i << table.shift) + rng.randrange(2 * half) for i in bins)
+            assert table.lookup(r << 16 | g << 8 | b) == nearest(
+                *(((c >> table.shift) << table.shift) + half for c in (r, g, b))
+            )
@@ -0,0 +1,87 @@
+import pytest
+
+from core.scheduler import FrameScheduler
+
+INTERVAL = 0.1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def scheduler_with(render):
+    clock = FakeClock()
+    return FrameScheduler(render, INTERVAL, clock=clock), clock
+
+
+def test_requests_before_a_frame_are_merged():
+    frames = []
+    scheduler, clock = scheduler_with(lambda: frames.append(clock.now))
+    for _ in range(5):
+        scheduler.request()
+    assert scheduler.tick()
+    assert frames == [0.0]
+    assert scheduler.stats.requests == 5
+    assert scheduler.stats.coalesced == 4
+    assert not scheduler.tick()  # Nothing requested since
+
+
+def test_frames_are_paced_to_the_interval():
+    frames = []
+    scheduler, clock = scheduler_with(lambda: frames.append(clock.now))
+    scheduler.request()
+    scheduler.tick()
+
+    clock.now = 0.02
+    scheduler.request()
+    assert scheduler.time_until_due() == pytest.approx(INTERVAL - 0.02)
+    assert not scheduler.tick()
+    clock.now = INTERVAL
+    assert scheduler.tick()
+    assert frames == [0.0, INTERVAL]
+
+
+def test_declined_frames_are_dropped_and_merged_into_the_next():
+    ready = [False]
+    frames = []
+
+    def render():
+        if not ready[0]:
+            return False
+        frames.append(clock.now)
+
+    scheduler, clock = scheduler_with(render)
+    scheduler.request()
+    for slot in range(3):
+        clock.now = slot * INTERVAL
+        assert not scheduler.tick()
+        assert scheduler.pending
+        scheduler.request()  # Changes keep arriving meanwhile
+
+    ready[0] = True
+    clock.now = 3 * INTERVAL
+    assert scheduler.tick()
+    stats = scheduler.stats
+    assert (stats.frames, stats.dropped, stats.merged) == (1, 3, 1)
+    assert stats.coalesced == 3
+    assert not scheduler.pending
+
+
+def test_missed_deadlines_are_reported():
+    missed = []
+
+    def render():
+        clock.now += 1.5 * INTERVAL  # Rendering takes longer than a frame
+
+    clock = FakeClock()
+    scheduler = FrameScheduler(
+        render, INTERVAL, on_missed_deadline=missed.append, clock=clock
+    )
+    scheduler.request()
+    scheduler.tick()
+    assert scheduler.stats.missed_deadlines == 1
+    assert missed == [scheduler.stats.last_lateness]
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from core import screen_buffer
+from core.screen_buffer import DEFAULT_COLOR, SPACE, ScreenBuffer
+
+BLANK = (SPACE, DEFAULT_COLOR, DEFAULT_COLOR, 0)
+
+
+def filled(width: int, height: int) -> ScreenBuffer:
+    """Buffer whose cells all differ, with no damage left"""
+    buffer = ScreenBuffer(width, height)
+    for y in range(height):
+        for x in range(width):
+            buffer.set_cell(x, y, chr(ord("a") + (x + y) % 26), x, y, 0)
+    buffer.take_damage()
+    return buffer
+
+
+def cells(buffer: ScreenBuffer) -> list[tuple[int, int, int, int]]:
+    return [
+        buffer.get_cell(x, y) for y in range(buffer.height) for x in range(buffer.width)
+    ]
+
+
+def test_resize_keeps_the_shared_cells():
+    buffer = filled(6, 4)
+    buffer.resize(8, 3)
+    assert (buffer.width, buffer.height) == (8, 3)
+    for y in range(3):
+        for x in range(8):
+            if x < 6:
+                assert buffer.get_cell(x, y) == (ord("a") + (x + y) % 26, x, y, 0)
+            else:
+                assert buffer.get_cell(x, y) == BLANK
+
+
+def test_resize_damages_only_the_added_cells():
+    buffer = filled(6, 4)
+    buffer.resize(8, 5)
+    assert buffer.take_damage() == [(6, 0, 2, 4), (0, 4, 8, 1)]
+
+    buffer.resize(3, 2)
+    assert buffer.take_damage() == []
+
+
+def test_resize_clips_pending_damage():
+    buffer = filled(6, 4)
+    buffer.mark_damaged(2, 1, 4, 3)
+    buffer.resize(4, 2)
+    assert buffer.take_damage() == [(2, 1, 2, 1)]
+
+
+def test_resize_to_the_same_size_changes_nothing():
+    buffer = filled(6, 4)
+    chars = buffer.chars
+    buffer.resize(6, 4)
+    assert buffer.chars is chars
+    assert buffer.take_damage() == []
+
+
+def blit_both_ways(monkeypatch, width, height, *blits):
+    """Apply the same blits with and without NumPy, return both buffers"""
+    pytest.importorskip("numpy")
+    results = []
+    for numpy in (screen_buffer.np, None):
+        monkeypatch.setattr(screen_buffer, "np", numpy)
+        buffer = ScreenBuffer(width, height)
+        buffer.take_damage()
+        for args in blits:
+            buffer.blit(*args)
+        results.append((cells(buffer), buffer.take_damage()))
+    return results
+
+
+def test_numpy_and_fallback_blits_agree(monkeypatch):
+    rng = random.Random(2)
+    blits = []
+    for _ in range(20):
+        w, h = rng.randint(1, 12), rng.randint(1, 6)
+        chars = ["".join(rng.choice("ab ─") for _ in range(w)) for _ in range(h)]
+        if rng.random() < 0.5:
+            chars = [list(row) for row in chars]
+        fg = [[rng.randrange(1 << 24) for _ in range(w)] for _ in range(h)]
+        blits.append(
+            (rng.randint(-3, 20), rng.randint(-3, 8), w, h, chars, fg, DEFAULT_COLOR, 0)
+        )
+    with_numpy, fallback = blit_both_ways(monkeypatch, 20, 8, *blits)
+    assert with_numpy == fallback
+
+
+def test_copy_from_agrees_with_and_without_numpy(monkeypatch):
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    source = ScreenBuffer(30, 20)
+    for _ in range(200):
+        source.set_cell(
+            rng.randrange(30), rng.randrange(20), rng.choice("ab  "), 5, DEFAULT_COLOR
+        )
+    results = []
+    for numpy in (screen_buffer.np, None):
+        monkeypatch.setattr(screen_buffer, "np", numpy)
+        target = filled(30, 20)
+        target.copy_from(source, 2, 1, 0, 0, 28, 19, blank_bg=0x102030)
+        target.copy_from(source, 0, 0, 5, 5, 20, 15, transparent=True)
+        results.append(cells(target))
+    # The fallback may damage whole row spans where NumPy finds the changes
+    assert results[0] == results[1]
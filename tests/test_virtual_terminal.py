@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from main import TerminalUI
+from src.core.virtual_terminal import MemoryTerminal, VirtualScreen
+from ui.layout import FlexLayout
+from ui.list_view import ListView
+from ui.text import Text
+
+
+@pytest.fixture
+def ui():
+    terminal = MemoryTerminal(60, 20)
+    tui = TerminalUI(terminal=terminal)
+    # Palette colors would be quantized, true colors reach the screen as is
+    tui.color_manager.color_mode = "truecolor"
+    return tui, terminal
+
+
+def assert_shown(tui, terminal):
+    """The virtual terminal shows exactly what the screen buffer holds"""
+    buffer, screen = tui.screen_buffer, terminal.screen.buffer
+    assert (screen.width, screen.height) == (buffer.width, buffer.height)
+    for y in range(buffer.height):
+        for x in range(buffer.width):
+            assert screen.get_cell(x, y) == buffer.get_cell(x, y), (x, y)
+
+
+def test_screen_matches_the_buffer_frame_by_frame(ui):
+    tui, terminal = ui
+    rng = random.Random(6)
+    plain = tui.create_window("plain", 0, 0, 30, 10, "Plain")
+    labels = [plain.add(Text(f"label {i}", 1, 1 + i)) for i in range(5)]
+    flex = tui.create_window("flex", 30, 0, 30, 10, "Flex")
+    flex.layout(FlexLayout("column"))
+    labels += [flex.add(Text(f"flex {i}")) for i in range(5)]
+    items = tui.create_window("items", 5, 8, 40, 12, "List")
+    items.add(ListView([f"item {i}" for i in range(100)], 1, 1, 30, 8))
+    overlay = tui.create_window("overlay", 20, 4, 20, 6, "Over")
+    overlay.transparent = True
+    overlay.add(Text("over", 2, 2))
+    tui.render()
+    assert_shown(tui, terminal)
+
+    for _ in range(40):
+        rng.choice(labels).content = "x" * rng.randint(0, 12)
+        if rng.random() < 0.3:
+            overlay.x = rng.randint(-5, 50)
+            overlay.y = rng.randint(-2, 18)
+        if rng.random() < 0.2:
+            plain.bg(rng.choice(["#203040", "#000000"]))
+        tui.render()
+        assert_shown(tui, terminal)
+
+
+def test_screen_matches_after_a_resize(ui):
+    tui, terminal = ui
+    window = tui.create_window("window", 2, 2, 40, 10, "Window")
+    window.add(Text("hello", 1, 1))
+    tui.render()
+
+    for width, height in ((30, 8), (80, 24), (60, 20)):
+        terminal.resize(width, height)
+        tui.resize()
+        tui.render()
+        assert_shown(tui, terminal)
+
+
+def test_virtual_screen_interprets_cursor_moves_and_colors():
+    screen = VirtualScreen(10, 3)
+    screen.feed(b"\x1b[2;3H\x1b[38;2;255;0;0mab\x1b[0m\r\ncd")
+    assert screen.text() == ["", "  ab", "cd"]
+    assert screen.buffer.get_cell(2, 1)[1] == 0xFF0000
+    assert screen.buffer.get_cell(0, 2)[1] == -1